@@ -27,9 +27,15 @@ Usage
 """
 from __future__ import annotations
 
-from requests import HTTPError, Response, Session
+from requests import HTTPError, Response
 from typing import Any, Dict, Optional, List, Sequence, Union
 
+import pandas as pd
+
+from app.client.api.arrow import ARROW_HEADERS, read_frame
+from app.client.api.http2 import make_session
+from app.client.api.ids import id_query
+
 class NotFound(Exception):
     """Raised when the micro-service returns HTTP 404."""
 
@@ -54,7 +60,7 @@ class AdbService:
         if not self.base_url:
             raise ValueError("base_url not provided and ADB_API_URL not set")
         self.timeout = timeout
-        self._session = Session()  # connection pooling
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
@@ -92,13 +98,11 @@ class AdbService:
         if fishing_trip_ids is None:
             raise ValueError("fishing_trip_ids may not be empty")
 
-        # build “…?species_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/fishing_station?fishing_trip_id={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("fishing_station", "fishing_trip_id", ids)
+        return self._get_json(path, body)
 
 
-    def get_fishing_station_for_target(self, fishing_trip_ids: Union[str, Sequence[str]], target_species_no: int) -> Dict[str, Any]:
+    def get_fishing_station_for_target(self, fishing_trip_ids: Union[str, Sequence[str]], target_species_no: int, frame: bool = False) -> Dict[str, Any]:
         # normalise to list[int] so we can join below
         if isinstance(fishing_trip_ids, str):
             ids: List[str] = [fishing_trip_ids]
@@ -111,10 +115,8 @@ class AdbService:
         if target_species_no is None:
             raise ValueError("target_species_no may not be empty")
 
-        # build “…?species_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/fishing_station_for_target?fishing_trip_id={query}&target_species_no=" + str(target_species_no)
-        return self._get_json(endpoint)
+        path, body = id_query("fishing_station_for_target", "fishing_trip_id", ids, target_species_no=target_species_no)
+        return self._get_frame(path, body) if frame else self._get_json(path, body)
 
 
     def get_trawl_and_seine_net(self, fishing_station_ids: Union[int, Sequence[int]]) -> Dict[str, Any]:
@@ -127,33 +129,43 @@ class AdbService:
         if fishing_station_ids is None:
             raise ValueError("fishing_station_ids may not be empty")
 
-        # build “…?species_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/trawl_and_seine_net?fishing_station_id={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("trawl_and_seine_net", "fishing_station_id", ids)
+        return self._get_json(path, body)
 
 
-    def get_target_assemblage(self, species_no: int, year: int) -> Dict[str, Any]:
+    def get_target_assemblage(self, species_no: int, year: int, frame: bool = False) -> Dict[str, Any]:
 
         if species_no is None or year is None:
             raise ValueError("species_no and year may not be empty")
 
         query = 'species_no=' + str(species_no) + '&year=' + str(year)
         endpoint = f"/target_assemblage?{query}"
-        return self._get_json(endpoint)
+        return self._get_frame(endpoint) if frame else self._get_json(endpoint)
 
 
     # ------------------------------------------------------------------ #
     # Internal helpers                                                   #
     # ------------------------------------------------------------------ #
-    def _get_json(self, path: str) -> Dict[str, Any]:
-        """Perform *GET* and return parsed JSON (raises ``NotFound`` on 404)."""
+    def _get(self, path: str, headers: Optional[Dict[str, str]] = None,
+             body: Optional[Dict[str, Any]] = None) -> Response:
+        """Perform *GET*, or *POST* of a *body* (see ``id_query``); raises ``NotFound`` on 404."""
         url = f"{self.base_url}{path}"
         try:
-            resp: Response = self._session.get(url, timeout=self.timeout)
+            if body is not None:
+                resp: Response = self._session.post(url, json=body, headers=headers, timeout=self.timeout)
+            else:
+                resp = self._session.get(url, headers=headers, timeout=self.timeout)
             resp.raise_for_status()
         except HTTPError as exc:  # covers 4xx & 5xx
             if exc.response is not None and exc.response.status_code == 404:
                 raise NotFound(f"Resource not found: {url}") from None
             raise
-        return resp.json()
+        return resp
+
+    def _get_json(self, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Perform *GET* (or the *body* POST) and return parsed JSON (raises ``NotFound`` on 404)."""
+        return self._get(path, body=body).json()
+
+    def _get_frame(self, path: str, body: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Perform *GET* (or the *body* POST) asking for Arrow and return a DataFrame (JSON if the service only has that)."""
+        return read_frame(self._get(path, ARROW_HEADERS, body))
@@ -27,9 +27,15 @@ Usage
 """
 from __future__ import annotations
 
-from requests import HTTPError, Response, Session
+from requests import HTTPError, Response
 from typing import Any, Dict, Optional, List, Sequence, Union
 
+import pandas as pd
+
+from app.client.api.arrow import ARROW_HEADERS, read_frame
+from app.client.api.http2 import make_session
+from app.client.api.ids import id_query
+
 
 class NotFound(Exception):
     """Raised when the micro-service returns HTTP 404."""
@@ -55,7 +61,7 @@ class ChannelService:
         if not self.base_url:
             raise ValueError("base_url not provided and CHANNEL_API_URL not set")
         self.timeout = timeout
-        self._session = Session()  # connection pooling
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
@@ -66,8 +72,8 @@ class ChannelService:
     def get_cruise(self, cruise_code: str) -> Dict[str, Any]:
         return self._get_json(f"/cruise/{cruise_code}")
 
-    def get_station(self, cruise_id: int) -> Dict[str, Any]:
-        return self._get_json(f"/station/{cruise_id}")
+    def get_station(self, cruise_id: int, frame: bool = False) -> Dict[str, Any]:
+        return self._get_frame(f"/station/{cruise_id}") if frame else self._get_json(f"/station/{cruise_id}")
 
     """
         Fetch one or many /measure rows.
@@ -94,12 +100,10 @@ class ChannelService:
         if not ids:
             raise ValueError("station_ids may not be empty")
 
-        # build “…?station_id=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/sample?station_id={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("sample", "station_id", ids)
+        return self._get_json(path, body)
 
-    def get_measure(self, sample_ids: Union[int, Sequence[int]]) -> Dict[str, Any]:
+    def get_measure(self, sample_ids: Union[int, Sequence[int]], columnar: bool = False, frame: bool = False) -> Dict[str, Any]:
         # normalise to list[int] so we can join below
         if isinstance(sample_ids, int):
             ids: List[int] = [sample_ids]
@@ -109,12 +113,11 @@ class ChannelService:
         if not ids:
             raise ValueError("sample_ids may not be empty")
 
-        # build “…?sample_id=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/measure?sample_id={query}"
-        return self._get_json(endpoint)
+        # columnar: {"columns": [...], "data": {column: [values...]}}
+        path, body = id_query("measure", "sample_id", ids, **({"shape": "columns"} if columnar else {}))
+        return self._get_frame(path, body) if frame else self._get_json(path, body)
 
-    def get_otolith(self, measure_ids: Union[int, Sequence[int]]) -> Dict[str, Any]:
+    def get_otolith(self, measure_ids: Union[int, Sequence[int]], frame: bool = False) -> Dict[str, Any]:
         # normalise to list[int] so we can join below
         if isinstance(measure_ids, int):
             ids: List[int] = [measure_ids]
@@ -124,10 +127,8 @@ class ChannelService:
         if not ids:
             raise ValueError("sample_ids may not be empty")
 
-        # build “…?otolith_id=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/otolith?measure_id={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("otolith", "measure_id", ids)
+        return self._get_frame(path, body) if frame else self._get_json(path, body)
 
     def get_species(self, species_nos: Union[int, Sequence[int]]) -> Dict[str, Any]:
         # normalise to list[int] so we can join below
@@ -139,10 +140,8 @@ class ChannelService:
         if not ids:
             raise ValueError("sample_ids may not be empty")
 
-        # build “…?species_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/species?species_no={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("species", "species_no", ids)
+        return self._get_json(path, body)
 
     def get_sexual_maturity(self, sexual_maturity_id: int) -> Dict[str, Any]:
         return self._get_json(f"/sexual_maturity/{sexual_maturity_id}")
@@ -151,14 +150,26 @@ class ChannelService:
     # ------------------------------------------------------------------ #
     # Internal helpers                                                   #
     # ------------------------------------------------------------------ #
-    def _get_json(self, path: str) -> Dict[str, Any]:
-        """Perform *GET* and return parsed JSON (raises ``NotFound`` on 404)."""
+    def _get(self, path: str, headers: Optional[Dict[str, str]] = None,
+             body: Optional[Dict[str, Any]] = None) -> Response:
+        """Perform *GET*, or *POST* of a *body* (see ``id_query``); raises ``NotFound`` on 404."""
         url = f"{self.base_url}{path}"
         try:
-            resp: Response = self._session.get(url, timeout=self.timeout)
+            if body is not None:
+                resp: Response = self._session.post(url, json=body, headers=headers, timeout=self.timeout)
+            else:
+                resp = self._session.get(url, headers=headers, timeout=self.timeout)
             resp.raise_for_status()
         except HTTPError as exc:  # covers 4xx & 5xx
             if exc.response is not None and exc.response.status_code == 404:
                 raise NotFound(f"Resource not found: {url}") from None
             raise
-        return resp.json()
+        return resp
+
+    def _get_json(self, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Perform *GET* (or the *body* POST) and return parsed JSON (raises ``NotFound`` on 404)."""
+        return self._get(path, body=body).json()
+
+    def _get_frame(self, path: str, body: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Perform *GET* (or the *body* POST) asking for Arrow and return a DataFrame (JSON if the service only has that)."""
+        return read_frame(self._get(path, ARROW_HEADERS, body))
@@ -0,0 +1,70 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Typed helper for the API gateway's own endpoints (not proxied services):
+
+    POST /batch     many service calls in one round trip
+
+Usage
+ api = GatewayService("http://localhost:8001")
+ api.batch([{"path": "/rdbes/harbour", "params": {"port_no": [1, 2]}},
+            {"path": "/gear/isscfg", "params": {"isscfg_no": 7}}])
+"""
+from __future__ import annotations
+
+from requests import Response
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.client.api.http2 import make_session
+from app.client.utils.misc import chunked
+
+# Must stay below the gateway's GATEWAY_BATCH_MAX_ITEMS
+BATCH_SIZE = 500
+
+
+class GatewayService:
+    """
+    Simple synchronous client for the API gateway.
+
+    Parameters
+    ----------
+    base_url :
+        Root URL of the gateway, *without* a trailing slash.
+        Can also be supplied via env-var ``API_GATEWAY_URL``.
+    timeout :
+        Per-request timeout in seconds (default **120**).
+    """
+
+    def __init__(self, base_url: Optional[str] = None, timeout: int = 120) -> None:
+        self.base_url = base_url
+        if not self.base_url:
+            raise ValueError("base_url not provided and API_GATEWAY_URL not set")
+        self.timeout = timeout
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
+
+    # ------------------------------------------------------------------ #
+    # Public API                                                         #
+    # ------------------------------------------------------------------ #
+    def batch(self, requests: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run sub-requests ``{"method", "path", "params", "body"}`` through
+        ``POST /batch``, ``BATCH_SIZE`` per round trip.
+
+        Returns one ``{"status", "body"}`` (or ``{"status", "error"}``)
+        per sub-request, in input order.
+        """
+        requests = list(requests)
+        results: List[Dict[str, Any]] = []
+        for part in chunked(requests, size=BATCH_SIZE):
+            results.extend(self._post_json("/batch", part))
+        return results
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers                                                   #
+    # ------------------------------------------------------------------ #
+    def _post_json(self, path: str, payload: Any) -> Any:
+        url = f"{self.base_url}{path}"
+        resp: Response = self._session.post(url, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
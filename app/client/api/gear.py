@@ -27,9 +27,12 @@ Usage
 """
 from __future__ import annotations
 
-from requests import HTTPError, Response, Session
+from requests import HTTPError, Response
 from typing import Any, Dict, Optional, List, Sequence, Union
 
+from app.client.api.http2 import make_session
+from app.client.api.ids import id_query
+
 class NotFound(Exception):
     """Raised when the micro-service returns HTTP 404."""
 
@@ -54,7 +57,7 @@ class GearService:
         if not self.base_url:
             raise ValueError("base_url not provided and GEAR_API_URL not set")
         self.timeout = timeout
-        self._session = Session()  # connection pooling
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
@@ -72,10 +75,8 @@ class GearService:
         if not ids:
             raise ValueError("fishing_gear_nos may not be empty")
 
-        # build “…?fishing_gear_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/fishing_gear?fishing_gear_no={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("fishing_gear", "fishing_gear_no", ids)
+        return self._get_json(path, body)
 
 
     def get_isscfg(self, isscfg_nos: Union[int, Sequence[int]]) -> Dict[str, Any]:
@@ -88,19 +89,20 @@ class GearService:
         if not ids:
             raise ValueError("isscfg_nos may not be empty")
 
-        # build “…?isscfg_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/isscfg?isscfg_no={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("isscfg", "isscfg_no", ids)
+        return self._get_json(path, body)
 
     # ------------------------------------------------------------------ #
     # Internal helpers                                                   #
     # ------------------------------------------------------------------ #
-    def _get_json(self, path: str) -> Dict[str, Any]:
-        """Perform *GET* and return parsed JSON (raises ``NotFound`` on 404)."""
+    def _get_json(self, path: str, body: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Perform *GET*, or *POST* of a *body* (see ``id_query``), and return parsed JSON (raises ``NotFound`` on 404)."""
         url = f"{self.base_url}{path}"
         try:
-            resp: Response = self._session.get(url, timeout=self.timeout)
+            if body is not None:
+                resp: Response = self._session.post(url, json=body, timeout=self.timeout)
+            else:
+                resp = self._session.get(url, timeout=self.timeout)
             resp.raise_for_status()
         except HTTPError as exc:  # covers 4xx & 5xx
             if exc.response is not None and exc.response.status_code == 404:
@@ -0,0 +1,111 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Optional HTTP/2 transport for the ``*Service`` clients.
+
+``requests`` only speaks HTTP/1.1, so concurrent lookups need one
+connection each. With ``API_HTTP2=true`` the services use an ``httpx``
+client instead and multiplex their requests over a few HTTP/2
+connections (h2c, i.e. HTTP/2 without TLS, for ``http://`` URLs; the
+gateway must then be served by an HTTP/2-capable server such as
+hypercorn). Needs ``httpx[http2]``.
+
+Responses and errors keep the ``requests`` interface the services rely
+on: ``raise_for_status()`` raises ``requests.HTTPError`` with
+``.response.status_code``; transport failures raise ``requests``'
+``ConnectionError`` / ``Timeout``.
+
+Usage
+ self._session = make_session()
+ resp = self._session.get(url, timeout=10)
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Optional
+
+from requests import ConnectionError, HTTPError, Session, Timeout
+
+HTTP2 = os.getenv("API_HTTP2", "false").lower() in {"1", "true", "yes"}
+
+
+class Http2Response:
+    """The part of ``requests.Response`` the services use, over an ``httpx.Response``."""
+
+    def __init__(self, resp) -> None:
+        self._resp = resp
+        self.status_code: int = resp.status_code
+        self.headers = resp.headers
+        self.url = str(resp.url)
+
+    @property
+    def content(self) -> bytes:
+        return self._resp.read()
+
+    @property
+    def text(self) -> str:
+        self._resp.read()
+        return self._resp.text
+
+    def iter_content(self, chunk_size: Optional[int] = None):
+        """Body chunks of a ``stream=True`` response."""
+        return self._resp.iter_bytes(chunk_size)
+
+    def close(self) -> None:
+        self._resp.close()
+
+    def json(self) -> Any:
+        self._resp.read()
+        return self._resp.json()
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise HTTPError(f"{self.status_code} {kind} Error for url: {self.url}", response=self)
+
+
+class Http2Session:
+    """``requests.Session`` look-alike backed by a multiplexing ``httpx.Client``."""
+
+    def __init__(self) -> None:
+        import httpx  # optional dependency, only needed with API_HTTP2
+
+        self._httpx = httpx
+        # https negotiates h2 via ALPN; plain-http hops use h2c prior knowledge
+        self._tls = httpx.Client(http2=True)
+        self._h2c = httpx.Client(http1=False, http2=True)
+
+    def _timeout(self, timeout: Any):
+        if isinstance(timeout, tuple):     # requests-style (connect, read)
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect=connect)
+        return timeout
+
+    def request(self, method: str, url: str, *, params: Optional[dict] = None, json: Any = None,
+                timeout: Any = None, stream: bool = False, **kwargs: Any) -> Http2Response:
+        client = self._h2c if url.startswith("http://") else self._tls
+        try:
+            req = client.build_request(method, url, params=params, json=json,
+                                       timeout=self._timeout(timeout), **kwargs)
+            resp = client.send(req, stream=stream)
+        except self._httpx.TimeoutException as exc:
+            raise Timeout(f"{method} {url} timed out: {exc}") from exc
+        except self._httpx.TransportError as exc:
+            raise ConnectionError(f"{method} {url} failed: {exc}") from exc
+        return Http2Response(resp)
+
+    def get(self, url: str, **kwargs: Any) -> Http2Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Http2Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self._tls.close()
+        self._h2c.close()
+
+
+def make_session():
+    """``Http2Session`` when ``API_HTTP2`` is set, otherwise a plain ``requests.Session``."""
+    return Http2Session() if HTTP2 else Session()
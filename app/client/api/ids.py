@@ -0,0 +1,36 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+GET or POST for the ID-list reads.
+
+Short lists stay in the URL (``GET /measure?sample_id=1,2,3``); above
+``API_QUERY_POST_THRESHOLD`` IDs (default 300) the request becomes
+``POST /measure/query`` with ``{"sample_id": [1, 2, 3, …]}`` as body, so
+large cruises never hit URL-length limits in the gateway or the services.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+QUERY_POST_THRESHOLD = int(os.getenv("API_QUERY_POST_THRESHOLD", "300"))
+
+
+def _plain(value: Any) -> Any:
+    # NumPy/pandas scalars → int/str so the body is JSON serialisable
+    return value.item() if hasattr(value, "item") else value
+
+
+def id_query(resource: str, param: str, ids: Sequence[Any], **params: Any) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    ``(path, body)`` for reading *resource* by *ids*: a GET path with
+    *body* ``None``, or ``/<resource>/query`` with the JSON body to POST.
+    *params* are further (scalar) query parameters.
+    """
+    if len(ids) > QUERY_POST_THRESHOLD:
+        body = {param: [_plain(i) for i in ids]}
+        body.update({k: _plain(v) for k, v in params.items()})
+        return f"/{resource}/query", body
+    query = "&".join([f"{param}=" + ",".join(str(i) for i in ids)] + [f"{k}={v}" for k, v in params.items()])
+    return f"/{resource}?{query}", None
@@ -27,9 +27,11 @@ Usage
 """
 from __future__ import annotations
 
-from requests import HTTPError, Response, Session
+from requests import HTTPError, Response
 from typing import Any, Dict, Optional
 
+from app.client.api.http2 import make_session
+
 class NotFound(Exception):
     """Raised when the micro-service returns HTTP 404."""
 
@@ -54,7 +56,7 @@ class QuotaService:
         if not self.base_url:
             raise ValueError("base_url not provided and AGF_API_URL not set")
         self.timeout = timeout
-        self._session = Session()  # connection pooling
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
 
     # ------------------------------------------------------------------ #
     # Public API                                                         #
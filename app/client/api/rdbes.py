@@ -1,9 +1,14 @@
 #!/usr/local/bin/python3
 # coding: utf-8
 
-from requests import request
 from urllib.parse import urlencode
-from typing import Any, Dict, List, Sequence, Union
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+import pandas as pd
+
+from app.client.api.arrow import ARROW_HEADERS, read_frame
+from app.client.api.http2 import make_session
+from app.client.api.ids import id_query
 
 # ---------------------------------------------------------------------------
 # Data‑access layer
@@ -21,19 +26,22 @@ class RdbesService:
         print(base_url)
         self.base_url = base_url
         self.timeout = timeout
+        self._session = make_session()  # connection pooling (HTTP/2 with API_HTTP2)
 
     # Internal HTTP helper --------------------------------------------------
 
     def _url(self, path: str) -> str:
         return f"{self.base_url}/{path.lstrip('/')}"
 
-    def _request(self, method: str, path: str, *, json: Dict[str, Any] | None = None) -> Any:
-        resp = request(method, self._url(path), json=json, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+    def _request(self, method: str, path: str, *, json: Dict[str, Any] | None = None,
+                 params: Dict[str, Any] | None = None) -> Any:
+        resp = self._session.request(method, self._url(path), json=json, params=params,
+                                     timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
         resp.raise_for_status()
         return resp.json() if resp.content else None
 
-    def _get_json(self, path: str) -> Dict[str, Any]:
-        return self._request("GET", path)
+    def _get_json(self, path: str, body: Dict[str, Any] | None = None) -> Dict[str, Any]:
+        return self._request("GET" if body is None else "POST", path, json=body)
 
     # Public API ------------------------------------------------------------
 
@@ -43,8 +51,58 @@ class RdbesService:
     def insert(self, table: str, payload: Dict[str, Any]) -> Any:
         return self._request("POST", table, json=payload)
 
-    def select(self, table: str) -> Any:
-        return self._request("GET", table)
+    def insert_bulk(self, table: str, payload: List[Dict[str, Any]], upsert: bool = False) -> Any:
+        """Insert many rows in one transaction; ``{"count", "ids"}`` with ids in input order.
+        With *upsert* the rows are merged on the table's natural key (``{"count", "changed"}``)."""
+        return self._request("POST", f"{table}/bulk" + ("?mode=upsert" if upsert else ""), json=payload)
+
+    def upload(self, tree: Dict[str, List[Dict[str, Any]]], upsert: bool = False) -> Any:
+        """Insert a whole design in one transaction; ``{"counts", "keys"}`` (client key → id).
+        With *upsert* tables that have a natural key are merged instead of inserted."""
+        return self._request("POST", "upload" + ("?mode=upsert" if upsert else ""), json=tree)
+
+    def delete_design(self, de_id: int) -> Any:
+        """Delete a design and its whole subtree; ``{"counts": {table: rows removed}}``."""
+        return self._request("DELETE", f"design/{int(de_id)}")
+
+    def select(self, table: str, **params: Any) -> Any:
+        """Rows of *table*; *params* are ``fields``/``limit``/``after`` and typed column filters."""
+        return self._request("GET", table, params=params or None)
+
+    def select_frame(self, table: str, **params: Any) -> pd.DataFrame:
+        """``select`` as a DataFrame, transferred as an Arrow stream when pyarrow is installed."""
+        resp = self._session.get(self._url(table), params=params or None, headers=ARROW_HEADERS,
+                                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        resp.raise_for_status()
+        return read_frame(resp)
+
+    def select_pages(self, table: str, page_size: int = 5000, **params: Any) -> Iterator[List[Dict[str, Any]]]:
+        """Yield *table* in keyset pages of *page_size* rows (follows ``X-Next-After``)."""
+        after = None
+        while True:
+            query = dict(params, limit=page_size)
+            if after is not None:
+                query["after"] = after
+            resp = self._session.get(self._url(table), params=query, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+            resp.raise_for_status()
+            yield resp.json()
+            after = resp.headers.get("X-Next-After")
+            if after is None:
+                return
+
+    def export(self, kind: str, path: str, **params: Any) -> int:
+        """Stream the server's ``h2``/``hvd``/``hsl`` CSV into *path*; returns the bytes written."""
+        resp = self._session.get(self._url(f"export/{kind}"), params=params or None, stream=True,
+                                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        try:
+            resp.raise_for_status()
+            written = 0
+            with open(path, "wb") as f:
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    written += f.write(chunk)
+            return written
+        finally:
+            resp.close()
 
     def get_harbour(self, port_nos: Union[int, Sequence[int]]) -> Dict[str, Any]:
         # normalise to list[int] so we can join below
@@ -56,15 +114,17 @@ class RdbesService:
         if not ids:
             raise ValueError("port_nos may not be empty")
 
-        # build “…?registration_no=1,2,3”
-        query = ",".join(str(i) for i in ids)
-        endpoint = f"/harbour?port_no={query}"
-        return self._get_json(endpoint)
+        path, body = id_query("harbour", "port_no", ids)
+        return self._get_json(path, body)
 
     def get_area(self, lat: float, lon: float) -> Dict[str, Any]:
         params = '?' + urlencode({"lat": lat, "lon": lon})
         return self._request("GET", f"/area{params}")
 
+    def get_areas(self, lats: List[Any], lons: List[Any]) -> List[Any]:
+        """FAO area code per (lat, lon) pair in one call; ``None`` for missing points or no area."""
+        return self._request("POST", "/area", json={"lat": lats, "lon": lons})["codes"]
+
     def get_metier(self, area_code: str, gear_type: str, target_assemblage: str, mesh_size: int) -> Dict[str, Any]:
         params = '?' + urlencode({
             "area_code": area_code,
@@ -74,3 +134,7 @@ class RdbesService:
         })
         return self._request("GET", f"/metier{params}")
 
+    def get_metiers(self, items: List[Dict[str, Any]]) -> List[Any]:
+        """metier per ``{"area_code", "gear_type", "target_assemblage", "mesh_size"}`` item, one call."""
+        return self._request("POST", "/metier", json=items)["metiers"]
+
@@ -2,6 +2,7 @@
 # coding: utf-8
 
 import os, json
+import pandas as pd
 from flask import jsonify
 from app.client.api.channel import ChannelService
 
@@ -44,6 +45,10 @@ class ChannelBusiness:
     def get_measure(self, sample_ids: list):
         return json.loads(jsonify(self.channel_service.get_measure(sample_ids)).data)
 
+    def get_measure_frame(self, sample_ids: list) -> pd.DataFrame:
+        """Measures of *sample_ids* as a DataFrame (Arrow stream, else the column-oriented JSON)."""
+        return self.channel_service.get_measure(sample_ids, columnar=True, frame=True)
+
     def get_otolith(self, measure_ids: list):
         return json.loads(jsonify(self.channel_service.get_otolith(measure_ids)).data)
 
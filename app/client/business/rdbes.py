@@ -10,6 +10,7 @@ from requests import HTTPError, Response
 
 from app.client.utils.pandas import match_closest_station
 from app.client.api.rdbes import RdbesService
+from app.client.api.gateway import GatewayService
 from app.client.business.channel import ChannelBusiness
 from app.client.business.vessel import VesselBusiness
 from app.client.business.gear import GearBusiness
@@ -46,7 +47,6 @@ from app.client.classes.agf.landings import AgfLandings
 from app.client.classes.quota.quota import QuotaQuota
 
 from app.client.utils.ora import nvl
-from app.client.utils.misc import chunked
 from server.services.adb.models import TargetAssemblage
 
 
@@ -73,6 +73,12 @@ class RdbesBusiness:
     print(rdbes_api_url)
     rdbes_service = RdbesService(rdbes_api_url.rstrip("/"))
 
+    gateway_api_url = os.environ.get("API_GATEWAY_URL")
+    if not gateway_api_url:
+        gateway_api_url = "http://127.0.0.1:8001"
+
+    gateway_service = GatewayService(gateway_api_url.rstrip("/"))
+
     channel_business = ChannelBusiness()
     vessel_business = VesselBusiness()
     gear_business = GearBusiness()
@@ -87,8 +93,27 @@ class RdbesBusiness:
         ret_json =  jsonify(self.rdbes_service.insert(table, payload))
         return json.loads(ret_json.data)
 
-    def select(self, table: str):
-        ret_json =  jsonify(self.rdbes_service.select(table))
+    def insert_bulk(self, table: str, records: list, upsert: bool = False) -> Any:
+        """Insert (or with *upsert* merge) *records* with one array-DML call; returns ``{"count", ...}``."""
+        if not records:
+            return {'count': 0, 'ids': []}
+        ret_json = jsonify(self.rdbes_service.insert_bulk(table, records, upsert=upsert))
+        return json.loads(ret_json.data)
+
+    def upload(self, tree: Dict[str, list], upsert: bool = False) -> Any:
+        """Insert a whole design (``{table: [records]}``, client ``_key`` references) in one transaction."""
+        ret_json = jsonify(self.rdbes_service.upload(tree, upsert=upsert))
+        return json.loads(ret_json.data)
+
+    def delete_design(self, de_id: int) -> Any:
+        """Wipe a previous submission: design *de_id* with its SD→…→BV subtree, in one transaction."""
+        ret_json = jsonify(self.rdbes_service.delete_design(de_id))
+        return json.loads(ret_json.data)
+
+    def select(self, table: str, **params):
+        """All rows of *table*, fetched in keyset pages (*params*: ``fields`` and column filters)."""
+        rows = [row for page in self.rdbes_service.select_pages(table, **params) for row in page]
+        ret_json = jsonify(rows)
         return json.loads(ret_json.data)
 
     def get_harbour(self, port_nos: list):
@@ -105,6 +130,32 @@ class RdbesBusiness:
             ret = json.loads(jsonify(self.rdbes_service.get_metier(area_code, gear_type, target_assemblage, mesh_size)).data)
             return ret['metier']
 
+    def get_areas(self, lats, lons) -> list:
+        """FAO area code per (lat, lon) pair, all resolved in one POST /area."""
+        points = [(float(lat), float(lon)) if pd.notna(lat) and pd.notna(lon) else (None, None)
+                  for lat, lon in zip(lats, lons)]
+        if not points:
+            return []
+        return self.rdbes_service.get_areas([p[0] for p in points], [p[1] for p in points])
+
+    def get_metiers(self, metierDf) -> list:
+        """metier6 per row of *metierDf* (area, fao_gear_code, target_assemblage, mesh_size) in one POST /metier."""
+        cols = ['area', 'fao_gear_code', 'target_assemblage', 'mesh_size']
+        rows = metierDf[cols].to_dict('records')
+        todo = [i for i, row in enumerate(rows) if all(pd.notna(row[c]) for c in cols)]
+        metiers = [None] * len(rows)
+        if not todo:
+            return metiers
+        results = self.rdbes_service.get_metiers([{
+            "area_code": rows[i]['area'],
+            "gear_type": rows[i]['fao_gear_code'],
+            "target_assemblage": rows[i]['target_assemblage'],
+            "mesh_size": int(rows[i]['mesh_size']),
+        } for i in todo])
+        for i, metier in zip(todo, results):
+            metiers[i] = metier
+        return metiers
+
     # ------------------------------------------------------------------ #
     # Internal helpers                                                   #
     # ------------------------------------------------------------------ #
@@ -143,7 +194,7 @@ class RdbesBusiness:
         return channelStationDf
 
 
-    def write_sample(self, cruiseDict, year, target_species_no):
+    def write_sample(self, cruiseDict, year, target_species_no, upsert=False):
 
         errors = False
         errorsHtml = {}
@@ -238,9 +289,7 @@ class RdbesBusiness:
         vesselDf['year'] = year
 
         # TODO remove, spurning um að færa aftar og reikna á adb-lag/long, 7.10.2025 ath. betur með þetta
-        channelStationDf['area'] = channelStationDf.apply(
-            lambda row: self.get_area(row['latitude'],row['longitude'] or {}), axis=1
-        )
+        channelStationDf['area'] = self.get_areas(channelStationDf['latitude'], channelStationDf['longitude'])
 
         # Sample
         station_ids = channelStationDf['station_id'].unique()
@@ -303,13 +352,7 @@ class RdbesBusiness:
         metierDf = metierDf[['area','fao_gear_code','target_assemblage','mesh_size']].dropna(subset=['area','fao_gear_code','target_assemblage','mesh_size']).drop_duplicates()
 
         if not metierDf.empty:
-            metierDf['metier6']  = metierDf.apply( lambda row: self.get_metier(
-                                                        row['area'], row['fao_gear_code'], row['target_assemblage'], row['mesh_size']
-                                                    ) if pd.notna(row['area']) and pd.notna(row['fao_gear_code'])
-                                                         and pd.notna(row['target_assemblage']) and pd.notna(row['mesh_size'])
-                                                    else None,
-                                                    axis=1
-                                                )
+            metierDf['metier6'] = self.get_metiers(metierDf)
         # sampleDf.drop(columns=['metier6'],inplace=True)
         sampleDf = sampleDf.merge(metierDf, on=['area','fao_gear_code','target_assemblage','mesh_size'], how='left')
 
@@ -327,11 +370,9 @@ class RdbesBusiness:
 
         # Otolith
         measure_ids = biotaMeasureDf['measure_id'].unique()
-        otolithList = []
-        for ids_chunk in chunked(measure_ids, size=400):
-            otol = self.channel_business.get_otolith(ids_chunk)
-            if type(otol) == list:
-                otolithList.extend(otol)
+        # one request for any number of ids (POST /otolith/query above the threshold)
+        otol = self.channel_business.get_otolith(measure_ids)
+        otolithList = otol if type(otol) == list else []
         otolithDf = pd.DataFrame(otolithList)
         otolithDf.drop(columns=['sample_id'], inplace=True)
 
@@ -537,46 +578,26 @@ class RdbesBusiness:
         # if errors:
         #     return {'return': -1}, errorsHtml
 
-        # Write ALL
-        for rec in vesselDetailsVD.to_dict('records'):
-            vesselDetailsRes = self.insert('vessel_details', rec)
-
-        for rec in individualSpeciesIS.to_dict('records'):
-            individualSpeciesRes = self.insert('individual_species', rec)
-
-        for rec in speciesListSL.to_dict('records'):
-            speciesListRes = self.insert('species_list', rec)
-
-
-        for rec in designDE.to_dict('records'):
-            designRes = self.insert('design', rec)
-
-        samplingDetailsSD['DEid'] = designRes['id']
-        for rec in samplingDetailsSD.to_dict('records'):
-            samplingDetailsRes = self.insert('sampling_details', rec)
-
-        fishingTripFT['SDid'] = samplingDetailsRes['id']
-        for rec in fishingTripFT.to_dict('records'):
-            fishingTripRes = self.insert('fishing_trip', rec)
-
-        for rec in fishingOperationFO.to_dict('records'):
-            fishingOperationRes = self.insert('fishing_operation', rec)
-
-
-        for rec in speciesSelectionSS.to_dict('records'):
-            speciesSelectionRes = self.insert('species_selection', rec)
+        # Write ALL / one transaction, the server maps the client keys "DE"/"SD" to the new ids
+        designDE['_key'] = 'DE'
+        samplingDetailsSD['_key'] = 'SD'
+        samplingDetailsSD['DEid'] = 'DE'
+        fishingTripFT['SDid'] = 'SD'
 
         # TODO constraint sample_sequence_uc, tekinn tímabundið af
-        for rec in sampleSA.to_dict('records'):
-            sampleRes = self.insert('sample', rec)
-
-        # # TODO frequency measures not submitted, only individual biological variables like in the DB
-        # for rec in frequencyMeasureFM.to_dict('records'):
-        #     frequencyMeasureRes = self.insert('frequency_measure', rec)
-
-        # TODO - comment out because of time
-        for rec in biologicalVariableBV.to_dict('records'):
-            biologicalVariableRes = self.insert('biological_variable', rec)
+        # TODO frequency measures not submitted, only individual biological variables like in the DB
+        uploadRes = self.upload({
+            'vessel_details': vesselDetailsVD.to_dict('records'),
+            'individual_species': individualSpeciesIS.to_dict('records'),
+            'species_list': speciesListSL.to_dict('records'),
+            'design': designDE.to_dict('records'),
+            'sampling_details': samplingDetailsSD.to_dict('records'),
+            'fishing_trip': fishingTripFT.to_dict('records'),
+            'fishing_operation': fishingOperationFO.to_dict('records'),
+            'species_selection': speciesSelectionSS.to_dict('records'),
+            'sample': sampleSA.to_dict('records'),
+            'biological_variable': biologicalVariableBV.to_dict('records'),
+        }, upsert=upsert)
 
         return {'return': 0}
 
@@ -936,6 +957,12 @@ class RdbesBusiness:
 
     def write_file(self, file_name, file_type):
 
+        if file_type == 'csv':
+            # Generated and streamed by the RDBES service, outputs as convert_to_csv
+            for kind in ('HVD', 'HSL', 'H2'):
+                self.rdbes_service.export(kind.lower(), f"{file_name}_{kind}.csv")
+            return None
+
         # Records read from DB
         # Suppost tables
         vessel_details = self.select('vessel_details')
@@ -973,19 +1000,7 @@ class RdbesBusiness:
             'bvnumbersampled': 'Int64'
         })
 
-        if file_type == 'csv':
-            return convert_to_csv(vessel_detailsDf,
-                                  species_listDf,
-                                  individual_speciesDf,
-                                  designDf,
-                                  sampling_detailsDf,
-                                  fishing_tripDf,
-                                  fishing_operationDf,
-                                  species_selectionDf,
-                                  sampleDf,
-                                  biological_variableDf,
-                                  file_name)
-        elif file_type == 'xml':
+        if file_type == 'xml':
             return convert_to_xml(designDf,
                                   vessel_details,
                                   sampling_detailsDf,
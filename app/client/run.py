@@ -238,12 +238,13 @@ def create_app() -> Flask:
                     flash('Note: No action taken, cruise: ' + cruise + ' not found in channel!')
                     return render_template('content.html')
 
-                # if action == 'Reload':
+                # if action == 'Reload':   # full wipe: rdbes_business.delete_design(DEid)
                 #     if rdbes_presentation.del_sample(cruiseDict) == -1:
                 #         flash('Rdbes data delete, unsuccessful!')
                 #         return render_template('content.html')
 
-                retSample = rdbes_business.write_sample(cruiseDict, year, species_no)
+                # Reload merges trips/hauls/fish on their natural keys instead of duplicating them
+                retSample = rdbes_business.write_sample(cruiseDict, year, species_no, upsert=(action == 'Reload'))
 
                 if retSample['return'] > -1:
                     flash('Sample data successfully uploaded!')
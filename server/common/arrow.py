@@ -0,0 +1,74 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Apache Arrow IPC responses for the bulk read endpoints.
+
+A client that sends ``Accept: application/vnd.apache.arrow.stream`` gets
+the rows as an Arrow IPC stream (typed columns, record batches written
+as they are encoded) instead of a JSON list. Needs ``pyarrow``; without
+it ``wants_arrow`` is always false and the endpoints keep answering JSON.
+
+Usage
+ if wants_arrow():
+     return arrow_response(data)
+ return jsonify(data)
+"""
+from __future__ import annotations
+
+import io
+from typing import Any, Iterator
+
+from flask import Response, request
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+BATCH_ROWS = 65536
+
+try:  # optional dependency
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - JSON only
+    pa = None
+
+
+def wants_arrow() -> bool:
+    """``True`` when pyarrow is available and the request prefers an Arrow stream over JSON."""
+    if pa is None:
+        return False
+    return request.accept_mimetypes.best_match(["application/json", ARROW_STREAM]) == ARROW_STREAM
+
+
+def to_table(data: Any) -> "pa.Table":
+    """
+    Arrow table from a list of row dicts, a single row dict, or the
+    column-oriented ``{"columns": [...], "data": {column: [...]}}`` of
+    ``fetch_columns``.
+    """
+    if isinstance(data, dict) and "columns" in data and isinstance(data.get("data"), dict):
+        return pa.table([data["data"][name] for name in data["columns"]], names=data["columns"])
+    if isinstance(data, dict):
+        data = [data]
+    return pa.Table.from_pylist(list(data))
+
+
+def _ipc_stream(table: "pa.Table") -> Iterator[bytes]:
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=BATCH_ROWS):
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()     # end-of-stream marker
+
+
+def arrow_response(data: Any, status: int = 200) -> Response:
+    """*data* (see ``to_table``) as a streamed Arrow IPC response."""
+    return Response(_ipc_stream(to_table(data)), status=status, mimetype=ARROW_STREAM)
+
+
+def columns_from_result(result) -> dict:
+    """``{"columns", "data"}`` of a Core result, transposed without per-row dicts."""
+    names = list(result.keys())
+    rows = result.all()
+    transposed = list(zip(*rows)) if rows else [()] * len(names)
+    return {"columns": names, "data": {name: list(col) for name, col in zip(names, transposed)}}
@@ -3,9 +3,17 @@
 
 from __future__ import annotations
 
-from sqlalchemy import select, and_
+from numbers import Integral
+
+from sqlalchemy import select, and_, or_, bindparam, func, literal_column
 from server.common.helper import to_dict
 
+# Oracle rejects IN lists of more than 1000 expressions (ORA-01795)
+IN_LIST_MAX = 1000
+# Built-in VARRAY(32767) collection types bound by ``id_filter`` on Oracle
+COLLECTION_TYPES = {int: "SYS.ODCINUMBERLIST", str: "SYS.ODCIVARCHAR2LIST"}
+COLLECTION_MAX = 32767
+
 # ---------------------------------------------------------------------------
 # One‑table SELECT helpers
 # ---------------------------------------------------------------------------
@@ -28,6 +36,7 @@ def fetch_many(
     limit=None,
     offset=None,
     order_by=None,
+    execution_options=None,
 ):
     """
     Generic helper to fetch one or many records.
@@ -47,18 +56,115 @@ def fetch_many(
     offset : int | None
     order_by : sqlalchemy.sql.expression.ClauseElement | Sequence[...]
         Order criteria (e.g. `User.created_at.desc()`).
+    execution_options : dict | None
+        Per-query options, e.g. `session.BULK_FETCH` for large result sets.
 
     Returns
     -------
     list[dict]
         A list of `to_dict(record)` results (empty list if nothing matched).
     """
-    stmt = select(model)
+    with SessionLocal() as session:
+        stmt = _filtered(session, select(model), column, values, where_clauses, limit, offset, order_by)
+        records = session.scalars(stmt, execution_options=execution_options or {}).all()
+        return [to_dict(r) for r in records]
+
+
+def fetch_columns(
+    SessionLocal,
+    model,
+    column=None,
+    values=None,
+    *,
+    where_clauses=None,
+    limit=None,
+    offset=None,
+    order_by=None,
+    execution_options=None,
+    shape="columns",
+):
+    """
+    ORM-free variant of `fetch_many` for large result sets.
+
+    Selects the table columns of *model* directly (no instances, no
+    identity map, no per-row dict); filters as in `fetch_many`.
+
+    Parameters
+    ----------
+    shape : "columns" | "rows"
+        ``"columns"`` → ``{"columns": [...], "data": {column: [values...]}}``,
+        which ``pd.DataFrame(data, columns=columns)`` takes as is;
+        ``"rows"`` → ``{"columns": [...], "data": [tuple, ...]}``.
 
-    # Primary filter (column == value or column.in_(values))
+    Returns
+    -------
+    dict
+        Column names (``to_dict`` keys) and the data in the requested shape;
+        ``data`` is empty when nothing matched.
+    """
+    table_cols = list(model.__table__.columns)
+    names = [c.key for c in table_cols]
+    with SessionLocal() as session:
+        stmt = _filtered(session, select(*table_cols), column, values, where_clauses, limit, offset, order_by)
+        rows = session.execute(stmt, execution_options=execution_options or {}).all()
+
+    if shape == "rows":
+        return {"columns": names, "data": [tuple(r) for r in rows]}
+    transposed = list(zip(*rows)) if rows else [()] * len(names)
+    return {"columns": names, "data": {name: list(col) for name, col in zip(names, transposed)}}
+
+
+def id_filter(session, column, values):
+    """
+    ``column IN values`` for a list of any length, with a stable SQL text.
+
+    On Oracle a list of ints or strs is bound as one collection
+    (``column IN (SELECT column_value FROM TABLE(:fetch_ids))``), so every
+    list size shares one cursor and plan. Other lists and other databases
+    get IN lists of at most `IN_LIST_MAX` ORed together, each padded
+    (repeating its last value) to a power-of-two length so that only a
+    handful of statement texts ever reach the cursor cache.
+    """
+    values = list(dict.fromkeys(values))    # de-duplicate, keep order
+    if not values:
+        return column.in_(values)
+
+    kind = str if all(isinstance(v, str) for v in values) else None
+    if kind is None and all(isinstance(v, Integral) and not isinstance(v, bool) for v in values):
+        kind = int
+    if kind is not None and session.get_bind().dialect.name == "oracle":
+        return _collection_in(session, column, values, COLLECTION_TYPES[kind])
+
+    parts = []
+    for start in range(0, len(values), IN_LIST_MAX):
+        chunk = values[start:start + IN_LIST_MAX]
+        size = min(1 << (len(chunk) - 1).bit_length(), IN_LIST_MAX)
+        parts.append(column.in_(chunk + chunk[-1:] * (size - len(chunk))))
+    return parts[0] if len(parts) == 1 else or_(*parts)
+
+
+def _collection_in(session, column, values, type_name):
+    # The type object is looked up once per pooled connection
+    dbapi_conn = session.connection().connection
+    types = dbapi_conn.info.setdefault("collection_types", {})
+    if type_name not in types:
+        types[type_name] = dbapi_conn.driver_connection.gettype(type_name)
+    coll_type = types[type_name]
+
+    parts = []
+    for n, start in enumerate(range(0, len(values), COLLECTION_MAX)):
+        ids = coll_type.newobject(values[start:start + COLLECTION_MAX])
+        subq = select(literal_column("column_value")).select_from(func.table(bindparam(f"fetch_ids_{n}", ids)))
+        parts.append(column.in_(subq))
+    return parts[0] if len(parts) == 1 else or_(*parts)
+
+
+def _filtered(session, stmt, column, values, where_clauses, limit, offset, order_by):
+    """Apply the `fetch_many` filter, sort and paging arguments to *stmt*."""
+    # Primary filter (column == value or column IN values, see `id_filter`)
     if column is not None and values is not None:
         if isinstance(values, (list, tuple, set)):
-            stmt = stmt.where(column.in_(values))
+            stmt = stmt.where(id_filter(session, column, values))
         else:
             stmt = stmt.where(column == values)
 
@@ -73,7 +179,4 @@ def fetch_many(
         stmt = stmt.limit(limit)
     if offset is not None:
         stmt = stmt.offset(offset)
-
-    with SessionLocal() as session:
-        records = session.scalars(stmt).all()
-        return [to_dict(r) for r in records]
+    return stmt
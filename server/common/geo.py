@@ -4,15 +4,23 @@
 # server/services/rdbes/fao_lookup.py  (example path)
 import os
 import math
+import numpy as np
 import geopandas as gpd
 from functools import lru_cache
-from shapely.geometry import Point
+from shapely.geometry import Point, box
 
 # Env-driven config (works in Docker and locally)
 FAO_GPKG_PATH  = os.getenv("FAO_GPKG_PATH", "/opt/geo/fao.gpkg")
 FAO_GPKG_LAYER = os.getenv("FAO_GPKG_LAYER", "fao")
 FAO_CODE_FIELD = os.getenv("FAO_GPKG_CODE_FIELD", "fao")  # change if your column name differs
 
+# Point-lookup cache: grid cells (degrees) classified once, plus an LRU of exact answers
+FAO_GRID_DEG        = float(os.getenv("FAO_GRID_DEG", 0.05))
+FAO_CELL_CACHE_SIZE = int(os.getenv("FAO_CELL_CACHE_SIZE", 500_000))
+FAO_POINT_CACHE_SIZE = int(os.getenv("FAO_POINT_CACHE_SIZE", 100_000))
+
+_BOUNDARY = object()   # cell crosses a polygon edge: needs the exact test
+
 @lru_cache(maxsize=1)
 def _load_fao(path: str, layer: str) -> gpd.GeoDataFrame:
     # Use pyogrio for simpler GDAL deps; fall back to default if unavailable
@@ -24,6 +32,24 @@ def _load_fao(path: str, layer: str) -> gpd.GeoDataFrame:
     _ = gdf.sindex
     return gdf
 
+@lru_cache(maxsize=FAO_CELL_CACHE_SIZE)
+def _cell_area(path: str, layer: str, code: str, ix: int, iy: int):
+    """
+    Classify grid cell (*ix*, *iy*) once: the code of the polygon holding
+    the whole cell, ``None`` when the cell touches no polygon, or
+    ``_BOUNDARY`` when a polygon edge runs through it.
+    """
+    gdf = _load_fao(path, layer)
+    cell = box(ix * FAO_GRID_DEG, iy * FAO_GRID_DEG, (ix + 1) * FAO_GRID_DEG, (iy + 1) * FAO_GRID_DEG)
+    inside = gdf.sindex.query(cell, predicate="within")
+    if len(inside):
+        val = gdf[code].iloc[int(inside.min())]   # first in layer order, as the point join
+        return None if isinstance(val, float) and math.isnan(val) else str(val)
+    if len(gdf.sindex.query(cell, predicate="intersects")):
+        return _BOUNDARY
+    return None
+
+
 def get_fao_area(
     lat: float,
     lon: float,
@@ -33,11 +59,28 @@ def get_fao_area(
 ) -> str | None:
     """
     Return the FAO area code for a given (lat, lon).  WGS84 expected.
+
+    Points in a grid cell that lies wholly inside one polygon (or wholly
+    outside all of them) are answered from the cell; only cells crossed
+    by a polygon edge, or layers not in lon/lat, take the exact lookup.
     """
     path  = gpkg_path  or FAO_GPKG_PATH
     layer = layer_name or FAO_GPKG_LAYER
     code  = code_field or FAO_CODE_FIELD
 
+    if lat is None or lon is None or math.isnan(lat) or math.isnan(lon):
+        return None
+
+    if _load_fao(path, layer).crs.to_epsg() == 4326:
+        area = _cell_area(path, layer, code, math.floor(lon / FAO_GRID_DEG), math.floor(lat / FAO_GRID_DEG))
+        if area is not _BOUNDARY:
+            return area
+    return _exact_fao_area(float(lat), float(lon), path, layer, code)
+
+
+@lru_cache(maxsize=FAO_POINT_CACHE_SIZE)
+def _exact_fao_area(lat: float, lon: float, path: str, layer: str, code: str) -> str | None:
+    """Exact point-in-polygon lookup (spatial join), memoised per point."""
     # Load the FAO layer
     gdf = _load_fao(path, layer)
 
@@ -58,3 +101,51 @@ def get_fao_area(
     if isinstance(val, float) and math.isnan(val):
         return None
     return str(val)
+
+
+def get_fao_areas(
+    lats,
+    lons,
+    gpkg_path: str | None = None,
+    layer_name: str | None = None,
+    code_field: str | None = None
+) -> list[str | None]:
+    """
+    Return the FAO area code for every (lat, lon) pair, in input order.
+
+    All points are resolved with one bulk ``sindex.query(predicate="within")``
+    instead of one ``sjoin`` per point. Missing/NaN coordinates and points
+    outside every polygon give ``None``; a point inside overlapping
+    polygons gets the first one in layer order.
+    """
+    path  = gpkg_path  or FAO_GPKG_PATH
+    layer = layer_name or FAO_GPKG_LAYER
+    code  = code_field or FAO_CODE_FIELD
+
+    lat_arr = np.array([np.nan if v is None else v for v in lats], dtype=float)
+    lon_arr = np.array([np.nan if v is None else v for v in lons], dtype=float)
+    if lat_arr.shape != lon_arr.shape:
+        raise ValueError("lats and lons must have the same length")
+
+    result: list[str | None] = [None] * len(lat_arr)
+    valid = np.flatnonzero(np.isfinite(lat_arr) & np.isfinite(lon_arr))
+    if valid.size == 0:
+        return result
+
+    gdf = _load_fao(path, layer)
+    points = gpd.GeoSeries(gpd.points_from_xy(lon_arr[valid], lat_arr[valid]), crs="EPSG:4326")
+    if gdf.crs != points.crs:
+        points = points.to_crs(gdf.crs)
+
+    point_idx, poly_idx = gdf.sindex.query(points, predicate="within")
+    # first polygon (layer order) per point
+    order = np.lexsort((poly_idx, point_idx))
+    point_idx, poly_idx = point_idx[order], poly_idx[order]
+    first = np.unique(point_idx, return_index=True)[1]
+
+    codes = gdf[code].to_numpy()
+    for p, g in zip(point_idx[first], poly_idx[first]):
+        val = codes[g]
+        if not (isinstance(val, float) and math.isnan(val)) and val is not None:
+            result[valid[p]] = str(val)
+    return result
@@ -2,7 +2,7 @@
 # coding: utf-8
 
 from typing import Any, Dict
-from flask import abort
+from flask import abort, request
 from sqlalchemy import (
     Table,
 )
@@ -17,32 +17,55 @@ def to_dict(model) -> Dict[str, Any]:
     return {c.key: getattr(model, c.key) for c in model.__table__.columns}
 
 
-def parse_int_list(raw: str | None, *, param_name: str) -> list[int]:
+def query_arg(name: str, default: Any = None, type: Any = None) -> Any:
     """
-    Parse ``"1,2,3" → [1, 2, 3]`` and validate.
+    ``request.args.get`` that also serves the ``POST /<resource>/query``
+    variants, whose parameters come as a JSON object body (ID lists as
+    JSON arrays) instead of the URL.
+    """
+    if request.method != "POST":
+        return request.args.get(name, default, type=type)
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(400, "Expected a JSON object body")
+    value = body.get(name)
+    if value is None:
+        return default
+    if type is not None:
+        try:
+            return type(value)
+        except (TypeError, ValueError):
+            return default
+    return value
+
+
+def parse_int_list(raw: str | list | None, *, param_name: str) -> list[int]:
+    """
+    Parse ``"1,2,3"`` (or a JSON array ``[1, 2, 3]``) → ``[1, 2, 3]`` and validate.
     Raises 400 if empty or if any element is not an int.
     """
     if not raw:
         abort(400, f"Missing required query-param “{param_name}” "
                    "(use e.g. ?cruise_id=101,102)")
     try:
-        return [int(x.strip()) for x in raw.split(",") if x.strip()]
-    except ValueError:
+        if isinstance(raw, list):
+            return [int(x) for x in raw]
+        return [int(x.strip()) for x in str(raw).split(",") if x.strip()]
+    except (TypeError, ValueError):
         abort(400, f"Invalid integer list passed to “{param_name}”")
 
 
-def parse_str_list(raw: str | None, *, param_name: str) -> list[str]:
+def parse_str_list(raw: str | list | None, *, param_name: str) -> list[str]:
     """
-    Parse ``"1,2,3" → [1, 2, 3]`` and validate.
-    Raises 400 if empty or if any element is not an int.
+    Parse ``"a,b,c"`` (or a JSON array ``["a", "b", "c"]``) → ``["a", "b", "c"]`` and validate.
+    Raises 400 if empty.
     """
     if not raw:
         abort(400, f"Missing required query-param “{param_name}” "
                    "(use e.g. ?cruise_id=101,102)")
-    try:
-        return [str(x.strip()) for x in raw.split(",") if x.strip()]
-    except ValueError:
-        abort(400, f"Invalid integer list passed to “{param_name}”")
+    if isinstance(raw, list):
+        return [str(x).strip() for x in raw if str(x).strip()]
+    return [x.strip() for x in str(raw).split(",") if x.strip()]
 
 
 def _payload_to_values(table: Table, data: Dict[str, Any]) -> Dict[str, Any]:
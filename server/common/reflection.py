@@ -0,0 +1,83 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Schema reflection with a local, fingerprinted cache.
+
+Reflecting a dozen Oracle tables costs many round trips per container
+start. ``reflect_tables`` can instead load the pickled ``MetaData`` from
+``<cache_dir>/<schema>.metadata.pickle``. The cache is used only while
+its fingerprint, a hash of the tables' ``ALL_TAB_COLUMNS`` rows (one
+query), still matches; otherwise the tables are reflected and the file
+is rewritten.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Iterable
+
+from sqlalchemy import MetaData, bindparam, text
+from sqlalchemy.engine import Engine
+
+_COLUMNS_SQL = text("""
+    SELECT table_name, column_id, column_name, data_type, data_length,
+           data_precision, data_scale, nullable
+      FROM all_tab_columns
+     WHERE owner = :owner
+       AND table_name IN :tables
+     ORDER BY table_name, column_id
+""").bindparams(bindparam("tables", expanding=True))
+
+
+def ddl_fingerprint(engine: Engine, schema: str, tables: Iterable[str]) -> str:
+    """SHA-256 over the ``ALL_TAB_COLUMNS`` rows of *tables* in *schema*."""
+    digest = hashlib.sha256()
+    with engine.connect() as conn:
+        rows = conn.execute(_COLUMNS_SQL, {"owner": schema.upper(), "tables": [t.upper() for t in tables]})
+        for row in rows:
+            digest.update(repr(tuple(row)).encode())
+            digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def reflect_tables(engine: Engine, schema: str, tables: list[str], cache_dir: str | None = None) -> MetaData:
+    """
+    ``MetaData`` holding *tables* of *schema* (keys ``"<schema>.<table>"``).
+
+    Without *cache_dir* this is a plain reflection. With it, a cached copy
+    whose fingerprint matches the database is returned instead; a missing,
+    stale or unreadable cache falls back to reflecting and rewriting it.
+    """
+    if not cache_dir:
+        return _reflect(engine, schema, tables)
+
+    fingerprint = ddl_fingerprint(engine, schema, tables)
+    path = os.path.join(cache_dir, f"{schema.lower()}.metadata.pickle")
+    try:
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached["fingerprint"] == fingerprint and set(tables) <= set(cached["tables"]):
+            return cached["metadata"]
+    except (OSError, EOFError, KeyError, TypeError, AttributeError, pickle.UnpicklingError):
+        pass
+
+    metadata = _reflect(engine, schema, tables)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to a temp file first so concurrent starts never read half a file
+        fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"fingerprint": fingerprint, "tables": list(tables), "metadata": metadata}, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass    # read-only or full disk: the service still starts, just uncached
+    return metadata
+
+
+def _reflect(engine: Engine, schema: str, tables: list[str]) -> MetaData:
+    metadata = MetaData(schema=schema)
+    metadata.reflect(bind=engine, schema=schema, only=tables)
+    return metadata
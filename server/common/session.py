@@ -2,19 +2,152 @@
 # coding: utf-8
 
 import os
+import threading
+import time
+from typing import Any, Dict
+
 import oracledb
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+
+# Per-query execution options for large result sets, e.g.
+#   session.scalars(stmt, execution_options=BULK_FETCH)
+BULK_FETCH = {"arraysize": 5000, "prefetchrows": 5000}
+
+# ---------------------------------------------------------------------------
+# Settings
+# ---------------------------------------------------------------------------
+
+def _db_option(service: str | None, key: str, default: str) -> str:
+    """
+    Read a database setting for one service.
+
+    ``<SERVICE>_DB_<KEY>`` (e.g. ``CHANNEL_DB_POOL_SIZE``) wins over the
+    shared ``DB_<KEY>``, which wins over *default*.
+    """
+    raw = os.getenv(f"{service.upper()}_DB_{key}") if service else None
+    raw = raw or os.getenv(f"DB_{key}")
+    return raw if raw not in (None, "") else default
+
+
+def _db_setting(service: str | None, key: str, default: int) -> int:
+    """Integer ``_db_option``."""
+    return int(_db_option(service, key, str(default)))
+
+
+# ---------------------------------------------------------------------------
+# Pool with checkout statistics
+# ---------------------------------------------------------------------------
+
+class TimedQueuePool(QueuePool):
+    """``QueuePool`` that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.waits += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+
+def pool_stats(bind) -> Dict[str, Any]:
+    """Usage of the pool behind *bind* (an engine or a sessionmaker), for health endpoints."""
+    engine = bind.kw["bind"] if isinstance(bind, sessionmaker) else bind
+    pool = engine.pool
+    stats: Dict[str, Any] = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(),
+                     overflow=pool.overflow(), idle=pool.checkedin())
+    if isinstance(pool, TimedQueuePool):
+        stats.update(
+            checkouts=pool.waits,
+            wait_avg_ms=round(1000 * pool.wait_total / pool.waits, 2) if pool.waits else 0.0,
+            wait_max_ms=round(1000 * pool.wait_max, 2),
+            timeouts=pool.timeouts,
+        )
+    return stats
+
 
 # ---------------------------------------------------------------------------
 # Environment & SQLAlchemy bootstrap
 # ---------------------------------------------------------------------------
 
-def get_session_local() -> sessionmaker[Session]:
+def oracle_engine(connect_args: Dict[str, Any], service: str | None = None) -> Engine:
+    """
+    Create an Oracle engine with the pool and fetch settings of *service*.
+
+    Settings (``<SERVICE>_DB_<KEY>``, else ``DB_<KEY>``):
+
+    POOL_SIZE, MAX_OVERFLOW, POOL_TIMEOUT, POOL_RECYCLE
+        SQLAlchemy pool (5, 10, 30 s, 1800 s).
+    DRCP
+        ``true`` → connect to the Database Resident Connection Pool
+        (``server_type=pooled``) with the ``cclass``/``purity`` given.
+    STMT_CACHE
+        oracledb statement cache per connection (20).
+    ARRAYSIZE, PREFETCHROWS
+        Rows per fetch round trip (1000, 1000). A single query can
+        override them with ``execution_options(arraysize=…, prefetchrows=…)``,
+        see ``BULK_FETCH``.
+    """
+    connect_args = dict(connect_args)
+    connect_args["stmtcachesize"] = _db_setting(service, "STMT_CACHE", 20)
+    if _db_option(service, "DRCP", "false").lower() in {"1", "true", "yes"}:
+        connect_args["server_type"] = "pooled"
+
+    engine = create_engine(
+        "oracle+oracledb://",
+        connect_args=connect_args,
+        future=True,
+        pool_pre_ping=True,
+        poolclass=TimedQueuePool,
+        pool_size=_db_setting(service, "POOL_SIZE", 5),
+        max_overflow=_db_setting(service, "MAX_OVERFLOW", 10),
+        pool_timeout=_db_setting(service, "POOL_TIMEOUT", 30),
+        pool_recycle=_db_setting(service, "POOL_RECYCLE", 1800),
+        echo=False,
+    )
+
+    arraysize = _db_setting(service, "ARRAYSIZE", 1000)
+    prefetchrows = _db_setting(service, "PREFETCHROWS", 1000)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _fetch_sizes(conn, cursor, statement, parameters, context, executemany):
+        if executemany:
+            return
+        options = context.execution_options if context is not None else {}
+        cursor.arraysize = options.get("arraysize", arraysize)
+        cursor.prefetchrows = options.get("prefetchrows", prefetchrows)
+
+    return engine
+
+
+def get_session_local(service: str | None = None) -> sessionmaker[Session]:
     """
     Initializes and returns a SQLAlchemy sessionmaker for Oracle database.
 
+    Parameters:
+        service: Service name; selects ``<SERVICE>_DB_*`` pool settings
+            (see ``oracle_engine``) and is the DRCP connection class.
     Returns:
         SessionLocal (sessionmaker): Configured SQLAlchemy session factory.
     Raises:
@@ -23,16 +156,11 @@ def get_session_local() -> sessionmaker[Session]:
     # Load environment variables from .env file
     load_dotenv()
 
-    # Define Oracle DB connection arguments
-    print(os.getenv("DB_RDBES_USR"))
-    print(os.getenv("DB_RDBES_PWD"))
-    print(os.getenv("DB_RDBES_DSN"))
-
     CONNECT_ARGS = {
         "user": os.getenv("DB_RDBES_USR"),
         "password": os.getenv("DB_RDBES_PWD"),
         "dsn": os.getenv("DB_RDBES_DSN"),
-        "cclass": "MYAPP",  # client class visible in v$session
+        "cclass": f"{service.upper()}_API" if service else "MYAPP",  # client class visible in v$session
         "purity": oracledb.ATTR_PURITY_SELF,
     }
 
@@ -42,13 +170,7 @@ def get_session_local() -> sessionmaker[Session]:
         raise RuntimeError(f"Missing required env vars: {', '.join(env_missing)}")
 
     # Create database engine
-    engine = create_engine(
-        "oracle+oracledb://",
-        connect_args=CONNECT_ARGS,
-        future=True,
-        pool_pre_ping=True,
-        echo=False,
-    )
+    engine = oracle_engine(CONNECT_ARGS, service)
 
     # Return configured sessionmaker
     return sessionmaker(bind=engine, future=True, expire_on_commit=False)
@@ -0,0 +1,114 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Client-side load balancing over the replicas of one upstream service.
+
+An upstream URL setting may list several endpoints separated by commas
+(``CHANNEL_API_URL=http://channel-1:5041,http://channel-2:5041``).
+Replicas that keep failing are ejected for a while (passive health
+checks); ``probe`` marks replicas down or up from their ``/health``
+answer (active health checks).
+"""
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+
+import httpx
+
+LEAST_OUTSTANDING, ROUND_ROBIN = "least_outstanding", "round_robin"
+
+
+def parse_endpoints(raw: str | None) -> list[str]:
+    """``"http://a:5041, http://b:5041/"`` → ``["http://a:5041", "http://b:5041"]``."""
+    return [url.strip().rstrip("/") for url in (raw or "").split(",") if url.strip()]
+
+
+@dataclass
+class Endpoint:
+    url: str
+    outstanding: int = 0        # requests sent and not yet released
+    failures: int = 0           # consecutive failed requests
+    ejected_until: float = 0.0
+    healthy: bool = True        # last active /health probe
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and time.monotonic() >= self.ejected_until
+
+
+# ---------------------------------------------------------------------------
+# Balancer
+# ---------------------------------------------------------------------------
+
+class Balancer:
+    """
+    Pick a replica per request.
+
+    *strategy* is ``least_outstanding`` (fewest open requests, ties in
+    turn) or ``round_robin``. After *eject_failures* consecutive failures
+    (0 disables) a replica is skipped for *eject_seconds*. When no replica
+    is available all of them are used, so an upstream is never cut off by
+    the balancer alone (that is the circuit breaker's job).
+    """
+
+    def __init__(self, urls: list[str], strategy: str = LEAST_OUTSTANDING,
+                 eject_failures: int = 3, eject_seconds: float = 30.0) -> None:
+        if strategy not in (LEAST_OUTSTANDING, ROUND_ROBIN):
+            raise ValueError(f"Unknown balancing strategy '{strategy}'")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.strategy = strategy
+        self.eject_failures = eject_failures
+        self.eject_seconds = eject_seconds
+        self._turn = itertools.count()
+
+    def pick(self) -> Endpoint:
+        if not self.endpoints:
+            raise LookupError("No upstream endpoints configured")
+        candidates = [ep for ep in self.endpoints if ep.available] or self.endpoints
+        turn = next(self._turn)
+        if self.strategy == ROUND_ROBIN:
+            return candidates[turn % len(candidates)]
+        # Rotate before taking the minimum so ties are spread evenly
+        offset = turn % len(candidates)
+        rotated = candidates[offset:] + candidates[:offset]
+        return min(rotated, key=lambda ep: ep.outstanding)
+
+    def acquire(self, endpoint: Endpoint) -> None:
+        endpoint.outstanding += 1
+
+    def release(self, endpoint: Endpoint) -> None:
+        endpoint.outstanding -= 1
+
+    def record_success(self, endpoint: Endpoint) -> None:
+        endpoint.failures = 0
+
+    def record_failure(self, endpoint: Endpoint) -> None:
+        endpoint.failures += 1
+        if 0 < self.eject_failures <= endpoint.failures:
+            endpoint.ejected_until = time.monotonic() + self.eject_seconds
+            endpoint.failures = 0
+
+    async def probe(self, client: httpx.AsyncClient, path: str = "/health", timeout: float = 2.0) -> None:
+        """Mark each replica healthy or not from one ``GET <url><path>``."""
+        async def check(endpoint: Endpoint) -> None:
+            try:
+                r = await client.get(f"{endpoint.url}{path}", timeout=timeout)
+                endpoint.healthy = r.status_code < 500
+            except httpx.HTTPError:
+                endpoint.healthy = False
+
+        await asyncio.gather(*(check(ep) for ep in self.endpoints))
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": ep.url,
+                "outstanding": ep.outstanding,
+                "healthy": ep.healthy,
+                "ejected_for": round(max(0.0, ep.ejected_until - now), 1),
+            }
+            for ep in self.endpoints
+        ]
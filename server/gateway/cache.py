@@ -0,0 +1,116 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Mapping
+
+
+# ---------------------------------------------------------------------------
+# Cached upstream response
+# ---------------------------------------------------------------------------
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: dict[str, str]
+    body: bytes
+    expires: float = field(default=0.0)
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+# ---------------------------------------------------------------------------
+# Key normalisation
+# ---------------------------------------------------------------------------
+
+def _normalise_value(value: str) -> str:
+    """
+    ``"3,1,2,1"`` → ``"1,2,3"``: ID lists are order- and duplicate-insensitive.
+    """
+    if "," not in value:
+        return value.strip()
+    items = {v.strip() for v in value.split(",") if v.strip()}
+    try:
+        return ",".join(str(i) for i in sorted(int(v) for v in items))
+    except ValueError:
+        return ",".join(sorted(items))
+
+
+def cache_key(route: str, params: Mapping[str, str]) -> str:
+    """Stable cache key for *route* + query parameters."""
+    query = "&".join(f"{k}={_normalise_value(params[k])}" for k in sorted(params))
+    return f"{route}?{query}"
+
+
+# ---------------------------------------------------------------------------
+# Byte-bounded TTL/LRU cache
+# ---------------------------------------------------------------------------
+
+class ResponseCache:
+    """
+    In-memory LRU of upstream responses, bounded by total body size.
+
+    Parameters
+    ----------
+    max_bytes :
+        Upper bound for the summed size of all cached entries; least
+        recently used entries are evicted to stay under it.
+    max_entry_bytes :
+        Responses larger than this are never cached.
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int | None = None) -> None:
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 4
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires <= time.monotonic():
+            self._drop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        if entry.size > self.max_entry_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+        entry.expires = time.monotonic() + ttl
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
@@ -0,0 +1,152 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Response compression for the gateway (``Accept-Encoding`` negotiation).
+
+gzip is always available; ``zstd`` and ``br`` are offered when the optional
+``zstandard`` / ``brotli`` packages are installed. Responses that already
+carry a ``Content-Encoding`` (compressed by the upstream) pass through as is.
+"""
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+
+# Server preference when the client accepts several encodings equally
+PREFERENCE = tuple(
+    enc for enc, available in (("zstd", zstandard), ("br", brotli), ("gzip", True)) if available
+)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/vnd.apache.arrow.stream", "text/")
+
+
+# ---------------------------------------------------------------------------
+# Negotiation
+# ---------------------------------------------------------------------------
+
+def negotiate(accept_encoding: str, offered: tuple[str, ...] = PREFERENCE) -> str | None:
+    """
+    Pick the best of *offered* for an ``Accept-Encoding`` header value.
+
+    Highest q-value wins, ties go to the earlier entry of *offered*;
+    returns ``None`` when nothing acceptable is offered.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        enc, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if enc:
+            weights[enc] = q
+    wildcard = weights.get("*", 0.0)
+    ranked = [(weights.get(enc, wildcard), -i, enc) for i, enc in enumerate(offered)]
+    q, _, enc = max(ranked, default=(0.0, 0, None))
+    return enc if q > 0 else None
+
+
+class _Compressor:
+    """Uniform ``compress`` / ``flush`` over zlib, brotli and zstandard."""
+
+    def __init__(self, encoding: str) -> None:
+        if encoding == "zstd":
+            self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+            self.compress, self.flush = self._obj.compress, self._obj.flush
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=4)
+            self.compress, self.flush = self._obj.process, self._obj.finish
+        else:
+            self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)   # 31 → gzip container
+            self.compress, self.flush = self._obj.compress, self._obj.flush
+
+
+# ---------------------------------------------------------------------------
+# ASGI middleware
+# ---------------------------------------------------------------------------
+
+class CompressionMiddleware:
+    """
+    Compress compressible responses of at least *minimum_size* bytes.
+
+    Bodies are compressed chunk by chunk, so streamed upstream responses
+    stay streamed. Bodies with unknown length are always compressed.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, encodings: tuple[str, ...] = PREFERENCE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encodings = tuple(enc for enc in encodings if enc in PREFERENCE)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message = {}
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                length = headers.get("content-length")
+                passthrough = (
+                    "content-encoding" in headers
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                    or (length is not None and int(length) < self.minimum_size)
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    start = message     # held back until we know the body size
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = MutableHeaders(raw=start["headers"])
+                del headers["content-length"]
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    data = compressor.compress(body) + compressor.flush()
+                    headers["content-length"] = str(len(data))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                await send(start)
+
+            data = compressor.compress(body)
+            if not more_body:
+                data += compressor.flush()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,9 +1,22 @@
 #!/usr/local/bin/python3
 # coding: utf-8
 
-import os, httpx
-from fastapi import FastAPI, Request
+import os, json, math, time, asyncio, httpx
+from contextlib import asynccontextmanager
+from functools import partial
+from dataclasses import dataclass, field
+from typing import Any
+from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from server.gateway.cache import ResponseCache, CachedResponse, cache_key
+from server.gateway.singleflight import SingleFlight
+from server.gateway.metrics import Counter, Gauge, Histogram, render
+from server.gateway.compression import CompressionMiddleware, PREFERENCE
+from server.gateway.resilience import CircuitBreaker, RETRY_ERRORS, RETRY_STATUSES, backoff_delay
+from server.gateway.balancer import Balancer, LEAST_OUTSTANDING, parse_endpoints
 
 # URLs where your Flask services are running
 RDBES_API_URL = os.getenv('RDBES_API_URL')
@@ -15,7 +28,263 @@ AGF_API_URL = os.getenv('AGF_API_URL')
 ADB_API_URL = os.getenv('ADB_API_URL')
 QUOTA_API_URL = os.getenv('QUOTA_API_URL')
 
-app = FastAPI(title="Quota API Gateway")
+# Gateway prefix -> upstream base URL, or comma-separated replica URLs
+UPSTREAMS = {
+    "rdbes": RDBES_API_URL,
+    "channel": CHANNEL_API_URL,
+    "taxon": TAXON_API_URL,
+    "gear": GEAR_API_URL,
+    "vessel": VESSEL_API_URL,
+    "agf": AGF_API_URL,
+    "adb": ADB_API_URL,
+    "quota": QUOTA_API_URL,
+}
+
+# Request headers that only make sense on the client -> gateway hop
+HOP_BY_HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+# Upstream response headers passed back to the client unchanged
+PASSTHROUGH_HEADERS = {
+    "content-type", "content-length", "content-encoding", "content-disposition",
+    "cache-control", "etag", "last-modified", "vary", "x-next-after",
+}
+
+# Stream upstream bodies straight through (default) or buffer them first
+STREAMING = os.getenv("GATEWAY_STREAMING", "true").lower() in {"1", "true", "yes"}
+
+
+def _route_table(raw: str | None, default: dict[str, float], default_value: float) -> dict[str, float]:
+    """
+    Parse ``"rdbes/harbour=3600,gear/isscfg"`` into ``{route: value}``.
+
+    Routes without ``=value`` get *default_value*; an unset variable
+    yields *default*, an empty one disables the feature.
+    """
+    if raw is None:
+        return dict(default)
+    table = {}
+    for item in raw.split(","):
+        route, _, value = item.strip().partition("=")
+        if route:
+            table[route.strip("/")] = float(value) if value else default_value
+    return table
+
+
+# Reference-data routes cached by the gateway: "<prefix>/<path>" -> TTL seconds
+CACHE_TTL = float(os.getenv("GATEWAY_CACHE_TTL", 3600))
+CACHE_ROUTES = _route_table(
+    os.getenv("GATEWAY_CACHE_ROUTES"),
+    {
+        route: CACHE_TTL
+        for route in (
+            "rdbes/harbour", "rdbes/metier", "rdbes/area",
+            "gear/fishing_gear", "gear/isscfg",
+            "taxon/species", "channel/species",
+        )
+    },
+    CACHE_TTL,
+)
+
+def _route_list(raw: str | None, default: tuple[str, ...]) -> tuple[str, ...]:
+    """Parse ``"channel/station,adb/target_assemblage"``; empty disables."""
+    if raw is None:
+        return default
+    return tuple(r.strip().strip("/") for r in raw.split(",") if r.strip())
+
+
+def _matches(route: str, prefixes: tuple[str, ...]) -> bool:
+    """``channel/station/12`` matches the prefix ``channel/station``."""
+    return any(route == p or route.startswith(p + "/") for p in prefixes)
+
+
+# Routes whose identical concurrent GETs share one upstream request
+COALESCE_ROUTES = _route_list(
+    os.getenv("GATEWAY_COALESCE_ROUTES"),
+    ("channel/station", "channel/sample", "adb/target_assemblage", "adb/fishing_station_for_target"),
+)
+inflight = SingleFlight()
+
+# Response compression: encodings offered (zstd/br need their optional
+# packages) and the smallest body worth compressing
+COMPRESS = os.getenv("GATEWAY_COMPRESS", "true").lower() in {"1", "true", "yes"}
+COMPRESS_ENCODINGS = _route_list(os.getenv("GATEWAY_COMPRESS_ENCODINGS"), PREFERENCE)
+COMPRESS_MIN_BYTES = int(os.getenv("GATEWAY_COMPRESS_MIN_BYTES", 1024))
+
+# GET routes that send a second, hedged request when the first one has not
+# answered within <NAME>_HEDGE_AFTER seconds
+HEDGE_ROUTES = _route_list(os.getenv("GATEWAY_HEDGE_ROUTES"), ())
+
+# POST /batch limits
+BATCH_MAX_ITEMS = int(os.getenv("GATEWAY_BATCH_MAX_ITEMS", 1000))
+BATCH_CONCURRENCY = int(os.getenv("GATEWAY_BATCH_CONCURRENCY", 16))
+
+response_cache = ResponseCache(
+    max_bytes=int(os.getenv("GATEWAY_CACHE_MAX_BYTES", 64 * 1024 * 1024)),
+    max_entry_bytes=int(os.getenv("GATEWAY_CACHE_MAX_ENTRY_BYTES", 0)) or None,
+)
+
+
+# ---------------------------------------------------------------------------
+# Metrics (served as Prometheus text on /metrics)
+# ---------------------------------------------------------------------------
+
+REQUESTS = Counter(
+    "gateway_requests_total", "Requests answered by the gateway",
+    ("upstream", "route", "method", "status"))
+REQUEST_SECONDS = Histogram(
+    "gateway_request_duration_seconds", "Gateway request latency until the last body byte",
+    ("upstream", "route"))
+RESPONSE_BYTES = Counter(
+    "gateway_response_bytes_total", "Response body bytes returned to clients",
+    ("upstream", "route"))
+UPSTREAM_CONNECT_SECONDS = Histogram(
+    "gateway_upstream_connect_seconds", "Time to open a new TCP connection to an upstream",
+    ("upstream",))
+UPSTREAM_RESPONSE_SECONDS = Histogram(
+    "gateway_upstream_response_seconds", "Upstream time until response headers",
+    ("upstream", "route"))
+UPSTREAM_DURATION_SECONDS = Histogram(
+    "gateway_upstream_duration_seconds", "Upstream time until the body was fully read",
+    ("upstream", "route"))
+UPSTREAM_ERRORS = Counter(
+    "gateway_upstream_errors_total", "Upstream requests that failed without a response",
+    ("upstream", "error"))
+UPSTREAM_RETRIES = Counter(
+    "gateway_upstream_retries_total", "Upstream GETs retried after a failure",
+    ("upstream",))
+UPSTREAM_HEDGES = Counter(
+    "gateway_upstream_hedges_total", "Hedged second requests sent for slow GETs",
+    ("upstream",))
+ENDPOINT_REQUESTS = Counter(
+    "gateway_endpoint_requests_total", "Upstream requests sent per replica",
+    ("upstream", "endpoint"))
+
+
+# ---------------------------------------------------------------------------
+# Upstream connection pools
+# ---------------------------------------------------------------------------
+
+def _upstream_option(name: str, key: str, default: str) -> str:
+    """
+    Read a setting for one upstream.
+
+    ``<NAME>_<KEY>`` (e.g. ``CHANNEL_MAX_CONNECTIONS``) wins over the
+    gateway-wide ``GATEWAY_<KEY>``, which wins over *default*.
+    """
+    raw = os.getenv(f"{name.upper()}_{key}") or os.getenv(f"GATEWAY_{key}")
+    return raw if raw not in (None, "") else default
+
+
+def _upstream_setting(name: str, key: str, default: float) -> float:
+    """Numeric ``_upstream_option``."""
+    return float(_upstream_option(name, key, str(default)))
+
+
+def _pool_limits(name: str) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(_upstream_setting(name, "MAX_CONNECTIONS", 100)),
+        max_keepalive_connections=int(_upstream_setting(name, "MAX_KEEPALIVE", 20)),
+        keepalive_expiry=_upstream_setting(name, "KEEPALIVE_EXPIRY", 30.0),
+    )
+
+
+def _make_client(name: str) -> httpx.AsyncClient:
+    """
+    Build the long-lived, pooled client for one upstream service.
+
+    With ``<NAME>_HTTP2`` requests are multiplexed over HTTP/2 connections;
+    the upstream must then run under an HTTP/2 server (the Flask dev
+    server only speaks HTTP/1.1).
+    """
+    limits = _pool_limits(name)
+    timeout = httpx.Timeout(
+        connect=_upstream_setting(name, "CONNECT_TIMEOUT", 10.0),   # connect timeout
+        read=_upstream_setting(name, "READ_TIMEOUT", 120.0),        # how long to wait for response data
+        write=_upstream_setting(name, "WRITE_TIMEOUT", 10.0),       # sending data timeout
+        pool=_upstream_setting(name, "POOL_TIMEOUT", 120.0),        # wait for a free pooled connection
+    )
+    # Optional HTTP/2 (needs httpx[http2]): h2c with prior knowledge for
+    # plain-http upstreams, ALPN negotiation for https ones
+    http2 = _upstream_option(name, "HTTP2", "false").lower() in {"1", "true", "yes"}
+    h2c = http2 and all(url.startswith("http://") for url in parse_endpoints(UPSTREAMS[name]))
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http1=not h2c, http2=http2)
+
+
+@dataclass
+class UpstreamPolicy:
+    """Retry, hedging, deadline and circuit-breaker settings of one upstream."""
+    retries: int
+    backoff_base: float
+    backoff_max: float
+    hedge_after: float
+    deadline: float         # seconds until response headers, retries included; 0 = none
+    breaker: CircuitBreaker
+
+
+def _make_policy(name: str) -> UpstreamPolicy:
+    return UpstreamPolicy(
+        retries=int(_upstream_setting(name, "RETRIES", 2)),
+        backoff_base=_upstream_setting(name, "BACKOFF_BASE", 0.1),
+        backoff_max=_upstream_setting(name, "BACKOFF_MAX", 2.0),
+        hedge_after=_upstream_setting(name, "HEDGE_AFTER", 2.0),
+        deadline=_upstream_setting(name, "DEADLINE", 30.0),
+        breaker=CircuitBreaker(
+            failure_threshold=int(_upstream_setting(name, "BREAKER_FAILURES", 5)),
+            reset_timeout=_upstream_setting(name, "BREAKER_RESET", 30.0),
+        ),
+    )
+
+
+def _make_balancer(name: str) -> Balancer:
+    return Balancer(
+        parse_endpoints(UPSTREAMS[name]),
+        strategy=_upstream_option(name, "BALANCE", LEAST_OUTSTANDING),
+        eject_failures=int(_upstream_setting(name, "EJECT_FAILURES", 3)),
+        eject_seconds=_upstream_setting(name, "EJECT_SECONDS", 30.0),
+    )
+
+
+async def _probe_forever(name: str, interval: float) -> None:
+    """Active ``/health`` checks of the replicas of one upstream."""
+    timeout = _upstream_setting(name, "HEALTH_TIMEOUT", 2.0)
+    while True:
+        await asyncio.sleep(interval)
+        await balancers[name].probe(clients[name], timeout=timeout)
+
+
+clients: dict[str, httpx.AsyncClient] = {}
+pool_counters: dict[str, dict[str, int]] = {}
+policies: dict[str, UpstreamPolicy] = {}
+balancers: dict[str, Balancer] = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    probes = []
+    for name in UPSTREAMS:
+        clients[name] = _make_client(name)
+        pool_counters[name] = {"requests": 0, "in_flight": 0, "errors": 0}
+        policies[name] = _make_policy(name)
+        balancers[name] = _make_balancer(name)
+        # Probing only pays off when there is another replica to fall back to
+        interval = _upstream_setting(name, "HEALTH_INTERVAL", 10.0)
+        if len(balancers[name].endpoints) > 1 and interval > 0:
+            probes.append(asyncio.create_task(_probe_forever(name, interval)))
+    try:
+        yield
+    finally:
+        for task in probes:
+            task.cancel()
+        await asyncio.gather(*probes, return_exceptions=True)
+        for client in clients.values():
+            await client.aclose()
+        clients.clear()
+
+
+app = FastAPI(title="Quota API Gateway", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,112 +294,567 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-timeout = httpx.Timeout(
-    connect=10.0,   # connect timeout
-    read=120.0,     # how long to wait for response data
-    write=10.0,     # sending data timeout
-    pool=120.0      # total connection pool timeout
-)
+if COMPRESS:
+    app.add_middleware(CompressionMiddleware, minimum_size=COMPRESS_MIN_BYTES, encodings=COMPRESS_ENCODINGS)
+
+
+def _pool_connections(name: str) -> list | None:
+    """
+    Connections of the httpcore pool behind one upstream client.
+
+    httpx does not expose its pool publicly; ``None`` when the transport
+    is not the default one (a mock, a different httpx/httpcore layout).
+    """
+    pool = getattr(getattr(clients[name], "_transport", None), "_pool", None)
+    try:
+        return list(pool.connections)
+    except (AttributeError, TypeError):
+        return None
+
+
+def _pool_stats(name: str) -> dict:
+    """Connection pool usage for one upstream client."""
+    limits = _pool_limits(name)
+    connections = _pool_connections(name)
+    stats = {
+        "url": UPSTREAMS[name],
+        "max_connections": limits.max_connections,
+        "max_keepalive_connections": limits.max_keepalive_connections,
+        "keepalive_expiry": limits.keepalive_expiry,
+        "connections": None,
+        "idle": None,
+        "active": pool_counters[name]["in_flight"],
+        "circuit": policies[name].breaker.state,
+        "endpoints": balancers[name].stats(),
+        **pool_counters[name],
+    }
+    if connections is not None:
+        stats["connections"] = len(connections)
+        stats["idle"] = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    return stats
+
+
+@dataclass
+class UpstreamCall:
+    """One request to forward: upstream *name* plus path, query and body."""
+    name: str
+    path: str
+    method: str = "GET"
+    params: dict[str, str] = field(default_factory=dict)
+    content: bytes = b""
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        return f"{self.name}/{self.path.strip('/')}"
+
+    @property
+    def key(self) -> str:
+        key = cache_key(self.route, self.params)
+        # the same URL answers JSON or an Arrow stream depending on Accept
+        return f"{key}#arrow" if "application/vnd.apache.arrow.stream" in self.headers.get("accept", "") else key
+
+    @property
+    def read_only(self) -> bool:
+        """GET/HEAD, or a ``POST …/query`` read whose IDs travel in the body."""
+        return self.method in ("GET", "HEAD") or (self.method == "POST" and self.path.rstrip("/").endswith("/query"))
+
+    @property
+    def label(self) -> str:
+        """Low-cardinality route for metrics: ``channel/station/12`` → ``channel/station``."""
+        return f"{self.name}/{self.path.strip('/').split('/')[0]}"
+
+
+async def _from_request(name: str, path: str, request: Request) -> UpstreamCall:
+    return UpstreamCall(
+        name=name,
+        path=path,
+        method=request.method,
+        params=dict(request.query_params),  # <-- forward query parameters
+        content=await request.body(),
+        headers={k: v for k, v in request.headers.items() if k.lower() not in HOP_BY_HOP_HEADERS},
+    )
+
+
+async def _send_once(call: UpstreamCall, headers: dict[str, str]) -> httpx.Response:
+    """One streamed attempt against the upstream, without retries."""
+    client = clients[call.name]
+    counters = pool_counters[call.name]
+    balancer = balancers[call.name]
+    try:
+        endpoint = balancer.pick()
+    except LookupError:
+        raise HTTPException(502, f"{call.name} service has no upstream URL configured")
+    url = f"{endpoint.url}/{call.path}"
+    connect_started = {}
+
+    async def trace(event: str, info: dict) -> None:
+        # httpcore reports new TCP connections; reused keep-alive ones are silent
+        if event == "connection.connect_tcp.started":
+            connect_started["t"] = time.perf_counter()
+        elif event == "connection.connect_tcp.complete" and "t" in connect_started:
+            UPSTREAM_CONNECT_SECONDS.observe(time.perf_counter() - connect_started["t"], call.name)
+
+    counters["requests"] += 1
+    counters["in_flight"] += 1
+    balancer.acquire(endpoint)
+    ENDPOINT_REQUESTS.inc(call.name, endpoint.url)
+    started = time.perf_counter()
+    try:
+        req = client.build_request(call.method, url, params=call.params, content=call.content, headers=headers)
+        req.extensions["trace"] = trace
+        r = await client.send(req, stream=True)
+    except BaseException as exc:    # also a cancelled hedge
+        counters["in_flight"] -= 1
+        balancer.release(endpoint)
+        if isinstance(exc, httpx.HTTPError):
+            counters["errors"] += 1
+            UPSTREAM_ERRORS.inc(call.name, type(exc).__name__)
+            balancer.record_failure(endpoint)
+        raise
+    UPSTREAM_RESPONSE_SECONDS.observe(time.perf_counter() - started, call.name, call.label)
+    if r.status_code in RETRY_STATUSES:
+        balancer.record_failure(endpoint)
+    else:
+        balancer.record_success(endpoint)
+    r.extensions["gateway.endpoint"] = endpoint    # released again in _close
+    return r
+
+
+def _discard(call: UpstreamCall, task: asyncio.Task) -> None:
+    """Release the response of an attempt that lost a hedging race."""
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(_close(call, task.result()))
+
+
+async def _send_hedged(call: UpstreamCall, headers: dict[str, str], hedge_after: float) -> httpx.Response:
+    """
+    Send *call*; if no response arrives within *hedge_after* seconds send a
+    second copy and return whichever answers first. The loser is cancelled.
+    """
+    tasks = [asyncio.ensure_future(_send_once(call, headers))]
+    winner = None
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            UPSTREAM_HEDGES.inc(call.name)
+            tasks.append(asyncio.ensure_future(_send_once(call, headers)))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    winner = task
+                    return task.result()
+        raise tasks[-1].exception()
+    finally:
+        for task in tasks:
+            if task is winner:
+                continue
+            if task.done():
+                _discard(call, task)
+            else:
+                task.add_done_callback(partial(_discard, call))
+                task.cancel()
+
+
+async def _send(call: UpstreamCall, *, identity: bool = False) -> httpx.Response:
+    """
+    Open a streamed request to the upstream registered under ``call.name``.
+
+    The body is not read; the caller must ``_close`` the response.
+    With *identity* the upstream is asked for an uncompressed body.
+
+    Idempotent GETs (and ``…/query`` POSTs) are retried with jittered back-off on connect/pool
+    errors and 502/503/504, and hedged on ``HEDGE_ROUTES``; a stalled
+    upstream (read timeout) is not retried. All attempts together must get
+    response headers within ``<NAME>_DEADLINE`` seconds, else 504.
+    A circuit breaker per upstream counts one failure per logical request
+    and rejects requests with 503 while the upstream keeps failing.
+    """
+    headers = dict(call.headers)
+    # Without this httpx would ask for gzip on the client's behalf
+    headers.setdefault("accept-encoding", "identity")
+    if identity:
+        headers["accept-encoding"] = "identity"
+
+    policy = policies[call.name]
+    breaker = policy.breaker
+    idempotent = call.read_only
+    retries = policy.retries if idempotent else 0
+    hedge_after = policy.hedge_after if idempotent and _matches(call.route, HEDGE_ROUTES) else 0
+
+    if not breaker.allow():
+        raise HTTPException(
+            503, f"{call.name} service circuit open",
+            headers={"Retry-After": str(math.ceil(breaker.retry_after()))},
+        )
+    deadline = time.monotonic() + policy.deadline if policy.deadline > 0 else math.inf
+
+    try:
+        for attempt in range(retries + 1):
+            if hedge_after > 0:
+                attempt_call = _send_hedged(call, headers, hedge_after)
+            else:
+                attempt_call = _send_once(call, headers)
+            remaining = deadline - time.monotonic()
+            r, error = None, None
+            try:
+                r = await asyncio.wait_for(attempt_call, None if remaining == math.inf else max(remaining, 0))
+            except asyncio.TimeoutError as exc:
+                breaker.record_failure()
+                UPSTREAM_ERRORS.inc(call.name, "DeadlineExceeded")
+                raise HTTPException(504, f"{call.name} service timed out after {policy.deadline:g}s") from exc
+            except RETRY_ERRORS as exc:
+                error = exc
+            except httpx.HTTPError as exc:
+                breaker.record_failure()
+                raise HTTPException(502, f"{call.name} service unavailable: {exc}") from exc
+
+            if r is not None and r.status_code not in RETRY_STATUSES:
+                breaker.record_success()
+                return r
+            delay = backoff_delay(attempt, policy.backoff_base, policy.backoff_max)
+            if attempt == retries or time.monotonic() + delay >= deadline:
+                breaker.record_failure()
+                if r is not None:
+                    return r
+                raise HTTPException(502, f"{call.name} service unavailable: {error}") from error
+            if r is not None:
+                await _close(call, r)
+            UPSTREAM_RETRIES.inc(call.name)
+            await asyncio.sleep(delay)
+    except BaseException:
+        breaker.release()   # no-op once the outcome was recorded
+        raise
+
+
+async def _close(call: UpstreamCall, r: httpx.Response) -> None:
+    """Release *r* and its pooled connection; later calls are no-ops."""
+    if r.extensions.get("gateway.released"):
+        return
+    r.extensions["gateway.released"] = True
+    await r.aclose()
+    pool_counters[call.name]["in_flight"] -= 1
+    balancers[call.name].release(r.extensions["gateway.endpoint"])
+    UPSTREAM_DURATION_SECONDS.observe(r.elapsed.total_seconds(), call.name, call.label)
+
+
+async def _read_raw(call: UpstreamCall, r: httpx.Response) -> bytes:
+    """
+    Read the undecoded upstream body and release the connection.
+
+    A transport error while reading (e.g. the upstream stalls after the
+    headers) is raised as a 502 ``HTTPException``.
+    """
+    try:
+        return b"".join([chunk async for chunk in r.aiter_raw()])
+    except httpx.HTTPError as exc:
+        pool_counters[call.name]["errors"] += 1
+        UPSTREAM_ERRORS.inc(call.name, type(exc).__name__)
+        raise HTTPException(502, f"{call.name} service unavailable: {exc}") from exc
+    finally:
+        await _close(call, r)
+
+
+def _observe(call: UpstreamCall, status: int, started: float, nbytes: int) -> None:
+    """Record one answered gateway request."""
+    REQUESTS.inc(call.name, call.label, call.method, str(status))
+    REQUEST_SECONDS.observe(time.perf_counter() - started, call.name, call.label)
+    RESPONSE_BYTES.inc(call.name, call.label, amount=nbytes)
+
+
+async def _relay(call: UpstreamCall, r: httpx.Response, started: float):
+    """
+    Yield the raw upstream body, recording metrics once it is sent.
+
+    The upstream response is released here rather than in a background
+    task, which Starlette skips when the client disconnects mid-stream.
+    """
+    nbytes = 0
+    try:
+        async for chunk in r.aiter_raw():
+            nbytes += len(chunk)
+            yield chunk
+    finally:
+        await _close(call, r)
+        _observe(call, r.status_code, started, nbytes)
+
+
+def _response_headers(r: httpx.Response) -> dict[str, str]:
+    return {k: v for k, v in r.headers.items() if k.lower() in PASSTHROUGH_HEADERS}
+
+
+async def _fetch_buffered(call: UpstreamCall) -> CachedResponse:
+    """
+    Fetch an uncompressed upstream response into memory.
+
+    GETs on ``COALESCE_ROUTES`` are de-duplicated: concurrent identical
+    requests wait for the first one and all receive its response.
+    """
+    async def fetch() -> CachedResponse:
+        r = await _send(call, identity=True)
+        body = await _read_raw(call, r)
+        return CachedResponse(r.status_code, _response_headers(r), body)
+
+    if call.method == "GET" and _matches(call.route, COALESCE_ROUTES):
+        return await inflight.do(call.key, fetch)
+    return await fetch()
+
+
+async def _fetch_cached(call: UpstreamCall) -> tuple[CachedResponse, bool]:
+    """
+    Serve a reference-data GET from the response cache, filling it on a miss.
+
+    Only 200 responses are stored; ``Cache-Control: no-cache`` from the
+    client bypasses the lookup and refreshes the entry.
+    Returns the response and whether it was a cache hit.
+    """
+    bypass = "no-cache" in call.headers.get("cache-control", "").lower()
+    entry = None if bypass else response_cache.get(call.key)
+    if entry is not None:
+        return entry, True
+
+    entry = await _fetch_buffered(call)
+    if entry.status_code == 200:
+        response_cache.put(call.key, entry, CACHE_ROUTES[call.route])
+    return entry, False
+
+
+async def _fetch(call: UpstreamCall) -> CachedResponse:
+    """Buffered fetch honouring the response cache and request coalescing."""
+    if call.method == "GET" and call.route in CACHE_ROUTES:
+        entry, _ = await _fetch_cached(call)
+        return entry
+    return await _fetch_buffered(call)
+
+
+async def _proxy(name: str, path: str, request: Request) -> Response:
+    """
+    Forward *request* to the upstream registered under *name*.
+
+    Status, content headers and body bytes are returned exactly as the
+    upstream sent them; with ``GATEWAY_STREAMING`` on, the body is relayed
+    chunk by chunk without being held in gateway memory. The client's
+    ``Accept-Encoding`` is forwarded, so an upstream-compressed body passes
+    through untouched; otherwise ``CompressionMiddleware`` compresses it.
+    """
+    started = time.perf_counter()
+    call = await _from_request(name, path, request)
+    if call.method == "GET" and call.route in CACHE_ROUTES:
+        try:
+            entry, hit = await _fetch_cached(call)
+        except HTTPException as exc:
+            _observe(call, exc.status_code, started, 0)
+            raise
+        _observe(call, entry.status_code, started, len(entry.body))
+        headers = {**entry.headers, "x-cache": "HIT" if hit else "MISS"}
+        return Response(entry.body, status_code=entry.status_code, headers=headers)
+    if call.method == "GET" and _matches(call.route, COALESCE_ROUTES):
+        try:
+            entry = await _fetch_buffered(call)
+        except HTTPException as exc:
+            _observe(call, exc.status_code, started, 0)
+            raise
+        _observe(call, entry.status_code, started, len(entry.body))
+        return Response(entry.body, status_code=entry.status_code, headers=entry.headers)
+
+    try:
+        r = await _send(call)
+    except HTTPException as exc:
+        _observe(call, exc.status_code, started, 0)
+        raise
+    if STREAMING:
+        return StreamingResponse(
+            _relay(call, r, started),
+            status_code=r.status_code,
+            headers=_response_headers(r),
+        )
+    try:
+        body = await _read_raw(call, r)
+    except HTTPException as exc:
+        _observe(call, exc.status_code, started, 0)
+        raise
+    _observe(call, r.status_code, started, len(body))
+    return Response(body, status_code=r.status_code, headers=_response_headers(r))
+
+
+# ---------------------------------------------------------------------------
+# Batch
+# ---------------------------------------------------------------------------
+
+class SubRequest(BaseModel):
+    method: str = "GET"
+    path: str                             # e.g. "/rdbes/harbour"
+    params: dict[str, Any] | None = None
+    body: Any = None
+
+
+def _decode_body(entry: CachedResponse) -> Any:
+    if not entry.body:
+        return None
+    if "json" in entry.headers.get("content-type", ""):
+        return json.loads(entry.body)
+    return entry.body.decode("utf-8", errors="replace")
+
+
+async def _run_sub_request(sub: SubRequest, semaphore: asyncio.Semaphore) -> dict[str, Any]:
+    name, _, path = sub.path.strip("/").partition("/")
+    if name not in UPSTREAMS:
+        return {"status": 404, "error": f"Unknown service '{name}'"}
+
+    headers = {"accept": "application/json"}
+    content = b""
+    if sub.body is not None:
+        content = json.dumps(sub.body).encode()
+        headers["content-type"] = "application/json"
+    params = {
+        k: ",".join(str(x) for x in v) if isinstance(v, (list, tuple)) else str(v)
+        for k, v in (sub.params or {}).items()
+    }
+    call = UpstreamCall(name, path, sub.method.upper(), params, content, headers)
+
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            entry = await _fetch(call)
+        except HTTPException as exc:
+            _observe(call, exc.status_code, started, 0)
+            return {"status": exc.status_code, "error": exc.detail}
+        except httpx.HTTPError as exc:
+            _observe(call, 502, started, 0)
+            return {"status": 502, "error": f"{name} service unavailable: {exc}"}
+    _observe(call, entry.status_code, started, len(entry.body))
+    try:
+        body = _decode_body(entry)
+    except ValueError as exc:   # incl. json.JSONDecodeError
+        return {"status": 502, "error": f"Invalid JSON from {name} service: {exc}"}
+    return {"status": entry.status_code, "body": body}
+
 
 @app.get("/")
 def root():
     return {"message": "API Gateway is running"}
 
+
+@app.get("/pool")
+def pool():
+    """Connection pool statistics per upstream service."""
+    if not clients:
+        raise HTTPException(503, "Gateway not started")
+    return {name: _pool_stats(name) for name in UPSTREAMS}
+
+
+@app.get("/cache")
+def cache_stats():
+    """Response cache counters and the cached routes with their TTLs."""
+    return {**response_cache.stats(), "routes": CACHE_ROUTES}
+
+
+@app.delete("/cache")
+def cache_clear():
+    response_cache.clear()
+    return {"message": "cache cleared"}
+
+
+@app.post("/batch")
+async def batch(requests: list[SubRequest]):
+    """
+    Run many sub-requests against the upstream services in one round trip.
+
+    Each item is ``{"method", "path", "params", "body"}`` with *path*
+    including the service prefix (``/rdbes/metier``); list-valued params
+    are sent comma-joined. Sub-requests run concurrently (at most
+    ``GATEWAY_BATCH_CONCURRENCY`` at a time) through the same cache and
+    coalescing as single calls. The response is a list in request order
+    of ``{"status", "body"}`` or ``{"status", "error"}``.
+    """
+    if len(requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(413, f"Batch larger than {BATCH_MAX_ITEMS} requests")
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+    return await asyncio.gather(*(_run_sub_request(sub, semaphore) for sub in requests))
+
+
+def _pool_samples(field: str):
+    for name in clients:
+        value = _pool_stats(name)[field]
+        if value is not None:       # unknown for non-default transports
+            yield (name,), value
+
+
+METRICS = [
+    REQUESTS, REQUEST_SECONDS, RESPONSE_BYTES,
+    UPSTREAM_CONNECT_SECONDS, UPSTREAM_RESPONSE_SECONDS, UPSTREAM_DURATION_SECONDS, UPSTREAM_ERRORS,
+    UPSTREAM_RETRIES, UPSTREAM_HEDGES,
+    Gauge("gateway_pool_connections", "Open upstream connections", ("upstream",),
+          lambda: _pool_samples("connections")),
+    Gauge("gateway_pool_idle_connections", "Idle keep-alive upstream connections", ("upstream",),
+          lambda: _pool_samples("idle")),
+    Gauge("gateway_upstream_in_flight", "Upstream requests currently open", ("upstream",),
+          lambda: _pool_samples("in_flight")),
+    ENDPOINT_REQUESTS,
+    Gauge("gateway_endpoint_up", "1 while the replica is neither ejected nor failing /health",
+          ("upstream", "endpoint"),
+          lambda: [((name, ep.url), int(ep.available)) for name, b in balancers.items() for ep in b.endpoints]),
+    Gauge("gateway_endpoint_outstanding", "Open requests per replica", ("upstream", "endpoint"),
+          lambda: [((name, ep.url), ep.outstanding) for name, b in balancers.items() for ep in b.endpoints]),
+    Gauge("gateway_circuit_open", "1 while the upstream circuit breaker is open or half-open", ("upstream",),
+          lambda: [((name,), int(p.breaker.state != "closed")) for name, p in policies.items()]),
+    Gauge("gateway_circuit_rejected_total", "Requests rejected by an open circuit", ("upstream",),
+          lambda: [((name,), p.breaker.rejected) for name, p in policies.items()], kind="counter"),
+    Gauge("gateway_cache_bytes", "Bytes held by the response cache", (),
+          lambda: [((), response_cache.stats()["bytes"])]),
+    Gauge("gateway_cache_hits_total", "Response cache hits", (),
+          lambda: [((), response_cache.hits)], kind="counter"),
+    Gauge("gateway_cache_misses_total", "Response cache misses", (),
+          lambda: [((), response_cache.misses)], kind="counter"),
+    Gauge("gateway_coalesced_requests_total", "GETs served by another request's upstream call", (),
+          lambda: [((), inflight.coalesced)], kind="counter"),
+]
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus text-format metrics per upstream and route."""
+    return PlainTextResponse(render(METRICS), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/coalesce")
+def coalesce_stats():
+    """Single-flight counters: upstream calls made vs. requests that shared one."""
+    return {**inflight.stats(), "routes": COALESCE_ROUTES}
+
+
 # -------- Acoustic service endpoints --------
 @app.api_route("/rdbes/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_acoustic(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{RDBES_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("rdbes", path, request)
 
 # -------- Channel service endpoints --------
 @app.api_route("/channel/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_channel(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{CHANNEL_API_URL}/{path}"
-        print(url)
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("channel", path, request)
 
 @app.api_route("/taxon/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_taxon(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{TAXON_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("taxon", path, request)
 
 @app.api_route("/gear/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_gear(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{GEAR_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("gear", path, request)
 
 @app.api_route("/vessel/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_vessel(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{VESSEL_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("vessel", path, request)
 
 @app.api_route("/agf/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_agf(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{AGF_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("agf", path, request)
 
 @app.api_route("/adb/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
 async def proxy_adb(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{ADB_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+    return await _proxy("adb", path, request)
 
 @app.api_route("/quota/{path:path}", methods=["GET", "POST", "PUT", "DELETE"])
-async def proxy_adb(path: str, request: Request):
-    print(path)
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        url = f"{QUOTA_API_URL}/{path}"
-        method = request.method
-        data = await request.body()
-        headers = dict(request.headers)
-        params = dict(request.query_params)  # <-- forward query parameters
-        r = await client.request(method, url, params=params, content=data, headers=headers)
-        return r.json()
+async def proxy_quota(path: str, request: Request):
+    return await _proxy("quota", path, request)
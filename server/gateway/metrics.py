@@ -0,0 +1,95 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Minimal in-process metrics rendered in the Prometheus text format
+(https://prometheus.io/docs/instrumenting/exposition_formats/).
+
+Only what the gateway needs: labelled counters, gauges and histograms.
+"""
+import bisect
+from typing import Callable, Iterable
+
+# Latency buckets in seconds, from a cached lookup to a slow Oracle view
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, **extra) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs += [f'{n}="{_escape(v)}"' for n, v in extra.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()) -> None:
+        self.name, self.help, self.label_names = name, help, labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.label_names, labels)} {value:g}"
+
+
+class Gauge:
+    """
+    Metric whose samples are read from *collect* at render time.
+
+    Use ``kind="counter"`` for totals kept elsewhere (e.g. cache hits).
+    """
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...],
+                 collect: Callable[[], Iterable[tuple[tuple, float]]], kind: str = "gauge") -> None:
+        self.name, self.help, self.label_names = name, help, labels
+        self._collect = collect
+        self.kind = kind
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._collect():
+            yield f"{self.name}{_labels(self.label_names, labels)} {value:g}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name, self.help, self.label_names = name, help, labels
+        self.buckets = buckets
+        self._values: dict[tuple, list] = {}    # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._values.setdefault(labels, [0] * len(self.buckets) + [0.0, 0])
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            series[idx] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.label_names, labels, le=f'{bound:g}')} {cumulative}"
+            yield f"{self.name}_bucket{_labels(self.label_names, labels, le='+Inf')} {series[-1]}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {series[-2]:g}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}"
+
+
+def render(metrics: Iterable) -> str:
+    """Prometheus text exposition of *metrics*."""
+    lines = []
+    for m in metrics:
+        lines.append(f"# HELP {m.name} {m.help}")
+        lines.append(f"# TYPE {m.name} {m.kind}")
+        lines.extend(m.samples())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,88 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+import random
+import time
+import httpx
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+# Upstream answers treated like a failed request (retried, counted by breakers)
+RETRY_STATUSES = {502, 503, 504}
+
+# Transport errors raised before the request reached the upstream, so a retry
+# cannot repeat work; read timeouts are not retried (the upstream is busy)
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+class CircuitBreaker:
+    """
+    Per-upstream circuit breaker.
+
+    After *failure_threshold* consecutive failed requests (0 disables the
+    breaker) the circuit opens and requests are rejected without touching
+    the upstream. Once *reset_timeout* seconds have passed it turns
+    half-open and lets *half_open_max* probe requests through: a success
+    closes it again, a failure re-opens it for another *reset_timeout*.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max: int = 1) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+        self._state = CLOSED
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self.probes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        """Whether a request may go upstream now (reserves a probe when half-open)."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and self.probes < self.half_open_max:
+            self.probes += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def release(self) -> None:
+        """Give back a half-open probe whose request was abandoned (e.g. cancelled)."""
+        if self._state == HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failure_threshold <= 0:     # breaker disabled
+            return
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+
+
+# ---------------------------------------------------------------------------
+# Retry back-off
+# ---------------------------------------------------------------------------
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential back-off: uniform in ``[0, min(cap, base * 2**attempt)]``."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
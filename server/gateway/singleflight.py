@@ -0,0 +1,45 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+# ---------------------------------------------------------------------------
+# In-flight request de-duplication
+# ---------------------------------------------------------------------------
+
+class SingleFlight:
+    """
+    Share one in-flight call among all concurrent callers with the same key.
+
+    The first caller for a key starts the coroutine; callers arriving while
+    it is still running wait for and receive the same result (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Run as its own task so a disconnecting first caller does not
+            # cancel the call for everybody else waiting on it
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+            self.leaders += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
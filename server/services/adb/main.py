@@ -11,6 +11,8 @@ sexual_maturity, otolith, harbour, vessel, gear).
 * No DDL — assumes tables already exist in Oracle.
 * Connection parameters come from env‑vars (see below).
 * Each endpoint returns a thin JSON object with the columns defined here.
+* ID-list endpoints also answer ``POST /<resource>/query`` with the same
+  parameters in a JSON body (ID lists as arrays), for lists too long for a URL.
 * SQLAlchemy 2.x, typing friendly, future‑style sessions.
 
 Required environment variables
@@ -43,8 +45,9 @@ from flask import Flask, abort, jsonify, request
 from sqlalchemy import select, and_, func
 from sqlalchemy.sql import operators
 
-from server.common.session import get_session_local
-from server.common.helper import to_dict, parse_int_list, parse_str_list
+from server.common.arrow import arrow_response, wants_arrow
+from server.common.session import BULK_FETCH, get_session_local, pool_stats
+from server.common.helper import to_dict, parse_int_list, parse_str_list, query_arg
 from server.common.fetch import fetch_many
 from server.services.adb.null import null_fishing_trip, null_fishing_station, null_fishing_station_for_target, null_trawl_and_seine_net
 from server.services.adb.models import FishingTrip, FishingStation, TrawlAndSeineNet, TargetAssemblage, TargetStationAssemblage
@@ -52,7 +55,7 @@ from server.services.adb.models import FishingTrip, FishingStation, TrawlAndSein
 # ---------------------------------------------------------------------------
 # Create Session
 # ---------------------------------------------------------------------------
-SessionLocal = get_session_local()
+SessionLocal = get_session_local("adb")
 
 
 def fetch_one(model, filters: dict):
@@ -156,7 +159,7 @@ def get_fishing_station(fishing_trip_ids: list[str] | str):
 def get_fishing_station_for_target(stmt):
     # Execute and serialize
     with SessionLocal() as session:
-        recs = session.scalars(stmt).all()
+        recs = session.scalars(stmt, execution_options=BULK_FETCH).all()
 
     data = [to_dict(r) for r in recs]
     if not data:
@@ -202,7 +205,8 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "ADB-service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(SessionLocal),
     }
     return jsonify(response), 200
 
@@ -244,13 +248,15 @@ def fishing_trip_endpoint():
 
 
 @app.get("/fishing_station")
+@app.post("/fishing_station/query")
 def fishing_station_endpoint():
-    fishing_trip_ids = parse_str_list(request.args.get("fishing_trip_id"), param_name="fishing_trip_id")
+    fishing_trip_ids = parse_str_list(query_arg("fishing_trip_id"), param_name="fishing_trip_id")
     data = get_fishing_station(fishing_trip_ids)
     return jsonify(data) if data else abort(404, "No Fishing Stations found")
 
 
 @app.get("/fishing_station_for_target")
+@app.post("/fishing_station_for_target/query")
 def fishing_station_for_target_endpoint():
     """
     Query target stations for a given species across multiple fishing trips.
@@ -258,8 +264,8 @@ def fishing_station_for_target_endpoint():
     - fishing_trip_ids: comma-separated list of trip IDs (strings)
     - target_species_no: integer species number
     """
-    fishing_trip_ids = parse_str_list(request.args.get("fishing_trip_id"), param_name="fishing_trip_id")
-    target_species_no = request.args.get("target_species_no", type=int)
+    fishing_trip_ids = parse_str_list(query_arg("fishing_trip_id"), param_name="fishing_trip_id")
+    target_species_no = query_arg("target_species_no", type=int)
 
     # Validate inputs
     if not fishing_trip_ids or target_species_no is None:
@@ -285,11 +291,14 @@ def fishing_station_for_target_endpoint():
 
     # Execute and serialize
     data = get_fishing_station_for_target(stmt)
-    return jsonify(data) if data else abort(404, "No Fishing Stations for target found")
+    if not data:
+        abort(404, "No Fishing Stations for target found")
+    return arrow_response(data) if wants_arrow() else jsonify(data)
 
 @app.get("/trawl_and_seine_net")
+@app.post("/trawl_and_seine_net/query")
 def trawl_and_seine_net_endpoint():
-    fishing_station_ids = parse_int_list(request.args.get("fishing_station_id"), param_name="fishing_station_id")
+    fishing_station_ids = parse_int_list(query_arg("fishing_station_id"), param_name="fishing_station_id")
     data = get_trawl_and_seine_net(fishing_station_ids)
     return jsonify(data) if data else abort(404, "No Trawl or Seine Net found")
 
@@ -306,7 +315,9 @@ def target_assemblage_endpoint():
         TargetAssemblage.landing_year: year
     }
     data = get_target_assemblage(filter)
-    return jsonify(data) if data else abort(404, "No Species found")
+    if not data:
+        abort(404, "No Species found")
+    return arrow_response(data) if wants_arrow() else jsonify(data)
 
 # ---------------------------------------------------------------------------
 
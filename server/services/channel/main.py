@@ -11,6 +11,8 @@ sexual_maturity, otolith, harbour, vessel, gear).
 * No DDL — assumes tables already exist in Oracle.
 * Connection parameters come from env‑vars (see below).
 * Each endpoint returns a thin JSON object with the columns defined here.
+* ID-list endpoints also answer ``POST /<resource>/query`` with the same
+  parameters in a JSON body (ID lists as arrays), for lists too long for a URL.
 * SQLAlchemy 2.x, typing friendly, future‑style sessions.
 
 Required environment variables
@@ -42,15 +44,16 @@ from datetime import datetime
 from flask import Flask, abort, jsonify, request
 
 from app.client.utils.misc import haskey
-from server.common.session import get_session_local
-from server.common.fetch import fetch_one, fetch_many
-from server.common.helper import to_dict, parse_int_list
+from server.common.arrow import arrow_response, wants_arrow
+from server.common.session import BULK_FETCH, get_session_local, pool_stats
+from server.common.fetch import fetch_one, fetch_many, fetch_columns
+from server.common.helper import to_dict, parse_int_list, query_arg
 from server.services.channel.models import Cruise, Station, Sample, Measure, Otolith, Species, SexualMaturity
 
 # ---------------------------------------------------------------------------
 # Create Session
 # ---------------------------------------------------------------------------
-SessionLocal = get_session_local()
+SessionLocal = get_session_local("channel")
 
 
 # --- Cruise --------------------------------------------------------------
@@ -84,7 +87,11 @@ def get_sample(station_ids: list[int] | int):
 
 # --- Measure --------------------------------------------------------------
 def get_measure(sample_ids: list[int] | int):
-    return fetch_many(SessionLocal, Measure, Measure.sample_id, sample_ids)
+    return fetch_many(SessionLocal, Measure, Measure.sample_id, sample_ids, execution_options=BULK_FETCH)
+
+
+def get_measure_columns(sample_ids: list[int] | int):
+    return fetch_columns(SessionLocal, Measure, Measure.sample_id, sample_ids, execution_options=BULK_FETCH)
 
 
 # --- Otolith --------------------------------------------------------------
@@ -92,6 +99,10 @@ def get_otolith(measure_ids: list[int] | int):
     return fetch_many(SessionLocal, Otolith, Otolith.measure_id, measure_ids)
 
 
+def get_otolith_columns(measure_ids: list[int] | int):
+    return fetch_columns(SessionLocal, Otolith, Otolith.measure_id, measure_ids, execution_options=BULK_FETCH)
+
+
 # --- Species --------------------------------------------------------------
 def get_species(species_no: list[int] | int):
     return fetch_many(SessionLocal, Species, Species.species_no, species_no)
@@ -118,7 +129,8 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "channel-service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(SessionLocal),
     }
     return jsonify(response), 200
 
@@ -134,29 +146,42 @@ def cruise_endpoint(cruise_code: str):
 @app.get("/station/<int:cruise_id>")
 def station_endpoint(cruise_id: int):
     data = get_station(cruise_id)
-    return jsonify(data) if data else abort(404, "No Stations found")
+    if not data:
+        abort(404, "No Stations found")
+    return arrow_response(data) if wants_arrow() else jsonify(data)
 
 
 # --- Sample --------------------------------------------------------------
 @app.get("/sample")
+@app.post("/sample/query")
 def sample_endpoint():
-    station_ids = parse_int_list(request.args.get("station_id"), param_name="station_id")
+    station_ids = parse_int_list(query_arg("station_id"), param_name="station_id")
     data = get_sample(station_ids)
     return jsonify(data) if data else abort(404, "No Samples found")
 
 
 # --- Measure -------------------------------------------------------------
 @app.get("/measure")
+@app.post("/measure/query")
 def measure_endpoint():
-    sample_ids = parse_int_list(request.args.get("sample_id"), param_name="sample_id")
+    sample_ids = parse_int_list(query_arg("sample_id"), param_name="sample_id")
+    arrow = wants_arrow()
+    if arrow or query_arg("shape") == "columns":   # {"columns": [...], "data": {column: [...]}}
+        data = get_measure_columns(sample_ids)
+        if not any(data["data"].values()):
+            abort(404, "No Measures found")
+        return arrow_response(data) if arrow else jsonify(data)
     data = get_measure(sample_ids)
     return jsonify(data) if data else abort(404, "No Measures found")
 
 
 # --- Otolith -------------------------------------------------------------
 @app.get("/otolith")
+@app.post("/otolith/query")
 def otolith_endpoint():
-    measure_ids = parse_int_list(request.args.get("measure_id"), param_name="measure_id")
+    measure_ids = parse_int_list(query_arg("measure_id"), param_name="measure_id")
+    if wants_arrow():   # an empty stream (schema only) when nothing is found
+        return arrow_response(get_otolith_columns(measure_ids))
     data = get_otolith(measure_ids)
 
     if data:
@@ -167,8 +192,9 @@ def otolith_endpoint():
 
 # --- Species -------------------------------------------------------------
 @app.get("/species")
+@app.post("/species/query")
 def species_endpoint():
-    species_nos = parse_int_list(request.args.get("species_no"), param_name="species_no")
+    species_nos = parse_int_list(query_arg("species_no"), param_name="species_no")
     data = get_species(species_nos)
     return jsonify(data) if data else abort(404, "No Species found")
 
@@ -11,6 +11,8 @@ sexual_maturity, otolith, harbour, vessel, gear).
 * No DDL — assumes tables already exist in Oracle.
 * Connection parameters come from env‑vars (see below).
 * Each endpoint returns a thin JSON object with the columns defined here.
+* ID-list endpoints also answer ``POST /<resource>/query`` with the same
+  parameters in a JSON body (ID lists as arrays), for lists too long for a URL.
 * SQLAlchemy 2.x, typing friendly, future‑style sessions.
 
 Required environment variables
@@ -41,15 +43,15 @@ import os
 from datetime import datetime
 from flask import Flask, abort, jsonify, request
 
-from server.common.session import get_session_local
+from server.common.session import get_session_local, pool_stats
 from server.common.fetch import fetch_many
-from server.common.helper import parse_int_list
+from server.common.helper import parse_int_list, query_arg
 from server.services.gear.models import FishingGear, Isscfg
 
 # ---------------------------------------------------------------------------
 # Create Session
 # ---------------------------------------------------------------------------
-SessionLocal = get_session_local()
+SessionLocal = get_session_local("gear")
 
 
 # --- Fishing gear ----------------------------------------------------------------
@@ -77,23 +79,26 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "gear-service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(SessionLocal),
     }
     return jsonify(response), 200
 
 
 # --- Fishing gear ----------------------------------------------------------------
 @app.get("/fishing_gear")
+@app.post("/fishing_gear/query")
 def fishing_gear_endpoint():
-    fishing_gear_nos = parse_int_list(request.args.get("fishing_gear_no"), param_name="fishing_gear_no")
+    fishing_gear_nos = parse_int_list(query_arg("fishing_gear_no"), param_name="fishing_gear_no")
     data = get_fishing_gear(fishing_gear_nos)
     return jsonify(data) if data else abort(404, "Fishing gear not found")
 
 
 # --- Isscfg ----------------------------------------------------------------
 @app.get("/isscfg")
+@app.post("/isscfg/query")
 def isscfg_endpoint():
-    isscfg_nos = parse_int_list(request.args.get("isscfg_no"), param_name="isscfg_no")
+    isscfg_nos = parse_int_list(query_arg("isscfg_no"), param_name="isscfg_no")
     data = get_isscfg(isscfg_nos)
     return jsonify(data) if data else abort(404, "Isscfg not found")
 
@@ -42,7 +42,7 @@ from datetime import datetime, time, date
 from flask import Flask, abort, jsonify, request
 from sqlalchemy import select, and_, or_
 
-from server.common.session import get_session_local
+from server.common.session import get_session_local, pool_stats
 from server.common.helper import to_dict
 from server.services.quota.null import null_quota
 from server.services.quota.models import Quota
@@ -50,7 +50,7 @@ from server.services.quota.models import Quota
 # ---------------------------------------------------------------------------
 # Create Session
 # ---------------------------------------------------------------------------
-SessionLocal = get_session_local()
+SessionLocal = get_session_local("quota")
 
 
 
@@ -138,7 +138,8 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "Quota service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(SessionLocal),
     }
     return jsonify(response), 200
 
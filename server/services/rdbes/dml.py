@@ -0,0 +1,352 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Set-based DML helpers for the RDBES service: bulk inserts, MERGE
+upserts on natural keys, the hierarchical design upload and its
+cascade delete.
+
+Rows are written with one ``executemany`` per statement shape, which the
+oracledb dialect runs as Oracle array DML (one round trip per batch,
+``RETURNING`` included) instead of one ``INSERT`` per row.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import Table, and_, delete, or_, select, text
+from sqlalchemy.engine import Connection
+
+from server.common.helper import _payload_to_values
+
+# Rows per executemany call; bounds the bind arrays held in memory
+BULK_BATCH_SIZE = int(os.getenv("RDBES_BULK_BATCH_SIZE", 5000))
+
+# Natural keys for MERGE upserts: table -> key columns (case-insensitive)
+DEFAULT_MERGE_KEYS = {
+    "vessel_details": ("VDencryptedVesselCode", "VDyear"),
+    "fishing_trip": ("FTid",),
+    "fishing_operation": ("FOid",),
+    "biological_variable": ("BVnationalUniqueFishId", "BVtypeMeasured"),
+}
+
+
+def _merge_keys(raw: str | None) -> Dict[str, tuple]:
+    """Parse ``"vessel_details=VDencryptedVesselCode+VDyear;fishing_trip=FTid"``."""
+    if raw is None:
+        return dict(DEFAULT_MERGE_KEYS)
+    keys = {}
+    for item in raw.split(";"):
+        name, _, columns = item.strip().partition("=")
+        if name and columns:
+            keys[name.strip()] = tuple(c.strip() for c in columns.split("+") if c.strip())
+    return keys
+
+
+MERGE_KEYS = _merge_keys(os.getenv("RDBES_MERGE_KEYS"))
+
+
+class PayloadError(ValueError):
+    """A bulk payload row cannot be inserted as given (answered with 400)."""
+
+
+def single_pk(table: Table):
+    """The primary-key column of *table*, or ``None`` for composite/no keys."""
+    if table.primary_key and len(table.primary_key.columns) == 1:
+        return next(iter(table.primary_key.columns))
+    return None
+
+
+def rows_to_values(table: Table, payload: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Map every JSON object of *payload* onto *table* columns (see ``_payload_to_values``)."""
+    rows = []
+    for i, item in enumerate(payload):
+        if not isinstance(item, dict):
+            raise PayloadError(f"Item {i} is not a JSON object")
+        values = _payload_to_values(table, item)
+        if not values:
+            raise PayloadError(f"Item {i} has no valid columns")
+        rows.append(values)
+    return rows
+
+
+def bulk_insert(conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Insert *rows* with array DML inside the caller's transaction.
+
+    Rows are grouped by their column set (so omitted columns keep their
+    database defaults) and sent ``BULK_BATCH_SIZE`` at a time.
+    Returns the primary key per row in input order, or ``[]`` when the
+    table has no single-column primary key.
+    """
+    pk_col = single_pk(table)
+    ids: List[Any] = [None] * len(rows)
+
+    shapes: Dict[tuple, List[int]] = {}
+    for i, row in enumerate(rows):
+        shapes.setdefault(tuple(sorted(row)), []).append(i)
+
+    for positions in shapes.values():
+        for start in range(0, len(positions), BULK_BATCH_SIZE):
+            part = positions[start:start + BULK_BATCH_SIZE]
+            params = [rows[i] for i in part]
+            if pk_col is None:
+                conn.execute(table.insert(), params)
+                continue
+            stmt = table.insert().returning(pk_col, sort_by_parameter_order=True)
+            for i, pk_value in zip(part, conn.execute(stmt, params).scalars()):
+                ids[i] = pk_value
+
+    return ids if pk_col is not None else []
+
+
+# ---------------------------------------------------------------------------
+# MERGE upsert
+# ---------------------------------------------------------------------------
+
+def merge_key_columns(table: Table) -> List[str]:
+    """Real column names of the natural key configured for *table* (``MERGE_KEYS``)."""
+    configured = MERGE_KEYS.get(table.name)
+    if not configured:
+        raise PayloadError(f"No natural key configured for '{table.name}' (RDBES_MERGE_KEYS)")
+    col_map = {col.name.upper(): col.name for col in table.columns}
+    missing = [k for k in configured if k.upper() not in col_map]
+    if missing:
+        raise PayloadError(f"Natural key column(s) {', '.join(missing)} not in '{table.name}'")
+    return [col_map[k.upper()] for k in configured]
+
+
+def _merge_sql(conn: Connection, table: Table, columns: List[str], keys: List[str]) -> str:
+    """
+    ``MERGE`` of one row shape; matched rows are only updated when a
+    value really differs (``DECODE`` treats two NULLs as equal).
+    """
+    quote = conn.dialect.identifier_preparer.quote
+    bind = {c: f"p{i}" for i, c in enumerate(columns)}
+    source = ", ".join(f":{bind[c]} AS {quote(c)}" for c in columns)
+    on = " AND ".join(f"t.{quote(c)} = s.{quote(c)}" for c in keys)
+    updates = [c for c in columns if c not in keys and not table.columns[c].primary_key]
+    sql = (
+        f"MERGE INTO {conn.dialect.identifier_preparer.format_table(table)} t "
+        f"USING (SELECT {source} FROM dual) s ON ({on})"
+    )
+    if updates:
+        sql += (
+            " WHEN MATCHED THEN UPDATE SET "
+            + ", ".join(f"t.{quote(c)} = s.{quote(c)}" for c in updates)
+            + " WHERE "
+            + " OR ".join(f"DECODE(t.{quote(c)}, s.{quote(c)}, 0, 1) = 1" for c in updates)
+        )
+    sql += (
+        f" WHEN NOT MATCHED THEN INSERT ({', '.join(quote(c) for c in columns)})"
+        f" VALUES ({', '.join('s.' + quote(c) for c in columns)})"
+    )
+    return sql
+
+
+def merge_rows(conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> int:
+    """
+    Upsert *rows* on the table's natural key with array-bound ``MERGE``
+    inside the caller's transaction; unchanged rows are left untouched.
+
+    Returns the number of rows inserted or changed.
+    """
+    keys = merge_key_columns(table)
+    shapes: Dict[tuple, List[Dict[str, Any]]] = {}
+    for i, row in enumerate(rows):
+        missing = [k for k in keys if row.get(k) is None]
+        if missing:
+            raise PayloadError(f"Item {i} lacks natural key value(s) {', '.join(missing)}")
+        shapes.setdefault(tuple(sorted(row)), []).append(row)
+
+    changed = 0
+    for columns, shape_rows in shapes.items():
+        stmt = text(_merge_sql(conn, table, list(columns), keys))
+        for start in range(0, len(shape_rows), BULK_BATCH_SIZE):
+            params = [
+                {f"p{i}": row[c] for i, c in enumerate(columns)}
+                for row in shape_rows[start:start + BULK_BATCH_SIZE]
+            ]
+            changed += max(conn.execute(stmt, params).rowcount, 0)
+    return changed
+
+
+def lookup_ids(conn: Connection, table: Table, rows: List[Dict[str, Any]]) -> List[Any]:
+    """Primary key per row of *rows*, found by its natural key (after a ``merge_rows``)."""
+    pk_col = single_pk(table)
+    if pk_col is None:
+        return []
+    keys = merge_key_columns(table)
+    key_cols = [table.columns[k] for k in keys]
+    found: Dict[tuple, Any] = {}
+    wanted = list({tuple(row[k] for k in keys) for row in rows})
+    for start in range(0, len(wanted), 500):     # Oracle caps IN lists at 1000 elements
+        part = wanted[start:start + 500]
+        if len(keys) == 1:
+            cond = key_cols[0].in_([k[0] for k in part])
+        else:
+            cond = or_(*(and_(*(c == v for c, v in zip(key_cols, k))) for k in part))
+        for row in conn.execute(select(pk_col, *key_cols).where(cond)):
+            found[tuple(row[1:])] = row[0]
+    return [found.get(tuple(row[k] for k in keys)) for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Hierarchical upload
+# ---------------------------------------------------------------------------
+
+# RDBES record type -> table; a column "<type>id" in another table points to it
+RECORD_TYPES = {
+    "DE": "design",
+    "SD": "sampling_details",
+    "VD": "vessel_details",
+    "FT": "fishing_trip",
+    "FO": "fishing_operation",
+    "SS": "species_selection",
+    "SA": "sample",
+    "FM": "frequency_measure",
+    "BV": "biological_variable",
+    "SL": "species_list",
+    "IS": "individual_species",
+}
+
+# Insert order: side tables first, then DE→SD→FT→FO→SS→SA→FM→BV
+UPLOAD_ORDER = [
+    "vessel_details", "species_list", "individual_species",
+    "design", "sampling_details", "fishing_trip", "fishing_operation",
+    "species_selection", "sample", "frequency_measure", "biological_variable",
+]
+
+CLIENT_KEY = "_key"
+
+
+def parent_columns(table: Table) -> Dict[str, str]:
+    """``{column: parent table}`` for the ``<type>id`` columns of *table* that point elsewhere."""
+    parents = {}
+    for col in table.columns:
+        name = col.name.upper()
+        if name.endswith("ID") and RECORD_TYPES.get(name[:-2]) not in (None, table.name):
+            parents[col.name] = RECORD_TYPES[name[:-2]]
+    return parents
+
+
+def upload_tree(conn: Connection, tables: Dict[str, Table], payload: Dict[str, Any],
+                upsert: bool = False) -> Dict[str, Any]:
+    """
+    Insert a whole design upload inside the caller's transaction.
+
+    *payload* maps table names to arrays of rows. A row may carry a
+    client-local ``"_key"``; parent-id columns (``DEid``, ``SDid``,
+    ``VDid``, ``FTid`` …) holding such a key are replaced by the id the
+    parent row got, other values are kept as real ids. Tables are
+    written level by level with ``bulk_insert``; with *upsert*, tables
+    that have a natural key in ``MERGE_KEYS`` are merged instead and
+    their ids looked up by that key.
+
+    Returns ``{"counts": {table: rows}, "keys": {table: {client key: id}}}``.
+    """
+    unknown = sorted(set(payload) - set(UPLOAD_ORDER))
+    if unknown:
+        raise PayloadError(f"Unknown upload tables: {', '.join(unknown)}")
+
+    keys: Dict[str, Dict[Any, Any]] = {}
+    counts: Dict[str, int] = {}
+    for name in UPLOAD_ORDER:
+        items = payload.get(name) or []
+        if not isinstance(items, list):
+            raise PayloadError(f"'{name}' must be a JSON array")
+        if not items:
+            continue
+        table = tables[name]
+        rows = rows_to_values(table, items)
+
+        for column, parent in parent_columns(table).items():
+            parent_keys = keys.get(parent, {})
+            for row in rows:
+                value = row.get(column)
+                if isinstance(value, (str, int)) and value in parent_keys:
+                    row[column] = parent_keys[value]
+
+        client_keys = [item.get(CLIENT_KEY) for item in items]
+        if upsert and name in MERGE_KEYS:
+            counts[name] = merge_rows(conn, table, rows)
+            ids = lookup_ids(conn, table, rows) if any(k is not None for k in client_keys) else []
+        else:
+            ids = bulk_insert(conn, table, rows)
+            counts[name] = len(rows)
+        if any(k is not None for k in client_keys):
+            if not ids:
+                raise PayloadError(f"'{name}' has no single-column primary key to map client keys to")
+            keys[name] = {k: pk for k, pk in zip(client_keys, ids) if k is not None}
+
+    return {
+        "counts": counts,
+        "keys": {name: {str(k): pk for k, pk in mapping.items()} for name, mapping in keys.items()},
+    }
+
+
+# ---------------------------------------------------------------------------
+# Cascade delete
+# ---------------------------------------------------------------------------
+
+# Design subtree, parents first: (table, column pointing to the level above)
+DESIGN_TREE = [
+    ("design", None),
+    ("sampling_details", "DEid"),
+    ("fishing_trip", "SDid"),
+    ("fishing_operation", "FTid"),
+    ("species_selection", "FOid"),
+    ("sample", "SSid"),
+    ("frequency_measure", "SAid"),
+    ("biological_variable", "SAid"),
+]
+
+
+def find_column(table: Table, name: str):
+    """Column *name* of *table*, matched case-insensitively (``None`` if absent)."""
+    for col in table.columns:
+        if col.name.upper() == name.upper():
+            return col
+    return None
+
+
+def id_column(table: Table, name: str):
+    """The column children reference: ``<type>id`` if present, else the primary key."""
+    col = find_column(table, name)
+    if col is None:
+        col = single_pk(table)
+    if col is None:
+        raise PayloadError(f"'{table.name}' has no id column for '{name}'")
+    return col
+
+
+def delete_design(conn: Connection, tables: Dict[str, Table], de_id: Any) -> Dict[str, int]:
+    """
+    Delete design *de_id* with its whole SD→FT→FO→SS→SA→FM/BV subtree
+    inside the caller's transaction.
+
+    Every level is one ``DELETE … WHERE <parent>id IN (subquery)``, so the
+    cost does not grow with round trips; children go first so foreign
+    keys hold throughout. The shared VD/SL/IS side tables are kept.
+
+    Returns the number of rows removed per table.
+    """
+    # select of the ids each level's children point to, built top-down
+    de_col = id_column(tables["design"], "DEid")
+    filters = {"design": de_col == de_id}
+    parent_ids = {"design": select(de_col).where(filters["design"])}
+    for name, parent_col in DESIGN_TREE[1:]:
+        parent = RECORD_TYPES[parent_col[:-2]]
+        table = tables[name]
+        col = find_column(table, parent_col)
+        if col is None:
+            raise PayloadError(f"'{name}' has no '{parent_col}' column")
+        filters[name] = col.in_(parent_ids[parent].scalar_subquery())
+        id_name = next(k for k, v in RECORD_TYPES.items() if v == name) + "id"
+        parent_ids[name] = select(id_column(table, id_name)).where(filters[name])
+
+    counts: Dict[str, int] = {}
+    for name, _ in reversed(DESIGN_TREE):
+        counts[name] = conn.execute(delete(tables[name]).where(filters[name])).rowcount
+    return {name: counts[name] for name, _ in DESIGN_TREE}
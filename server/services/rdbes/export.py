@@ -0,0 +1,136 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Streaming RDBES CSV export (H2, HVD, HSL) straight from Oracle.
+
+H2 is written depth-first (DE → SD → FT → FO → SS → SA → BV). Every
+level is read with one joined cursor that carries the id path from the
+design down to the row, ordered by that path. Merging the cursors on
+the path gives the depth-first order, because a parent's path is a
+prefix of (and so sorts before) its children's paths. Memory stays at
+one fetch batch per level whatever the export size.
+
+As in the RDBES upload format, rows have no header and only the
+columns from the ``*recordtype`` column onwards.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import io
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List
+
+from sqlalchemy import Table, select
+from sqlalchemy.engine import Engine
+
+from server.services.rdbes.dml import DESIGN_TREE, RECORD_TYPES, find_column, id_column
+
+# H2 levels; frequency measures are not part of the submitted hierarchy
+H2_LEVELS = [(name, parent) for name, parent in DESIGN_TREE if name != "frequency_measure"]
+
+FETCH_SIZE = 2000   # rows per fetch round trip and per yielded chunk
+
+
+def record_columns(table: Table) -> list:
+    """Columns of *table* from the first ``*recordtype`` column to the end."""
+    columns = list(table.columns)
+    idx = next((i for i, c in enumerate(columns) if c.name.lower().endswith("recordtype")), None)
+    if idx is None:
+        raise ValueError(f"'{table.name}' has no '*recordtype' column")
+    return columns[idx:]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.date().isoformat() if value.time() == datetime.min.time() else value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    return value
+
+
+def _csv_chunks(rows: Iterable[tuple]) -> Iterator[str]:
+    """Render *rows* as CSV text, ``FETCH_SIZE`` rows per yielded chunk."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n", quoting=csv.QUOTE_MINIMAL)
+    n = 0
+    for row in rows:
+        writer.writerow([_csv_value(v) for v in row])
+        n += 1
+        if n % FETCH_SIZE == 0:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue()
+
+
+def _stream(engine: Engine):
+    """Connection with server-side cursors and a byte-ordered sort (ids compare as in Python)."""
+    conn = engine.connect().execution_options(stream_results=True, yield_per=FETCH_SIZE)
+    if conn.dialect.name == "oracle":
+        conn.exec_driver_sql("ALTER SESSION SET NLS_SORT = BINARY")
+    return conn
+
+
+def _level_query(tables: Dict[str, Table], depth: int, design_filters: List[Any]):
+    """Rows of level *depth* with their id path from the design, ordered by that path."""
+    path, joined = [], None
+    for name, parent_col in H2_LEVELS[:depth + 1]:
+        table = tables[name]
+        type_id = next(k for k, v in RECORD_TYPES.items() if v == name) + "id"
+        if joined is None:
+            joined = table
+        else:
+            parent = tables[RECORD_TYPES[parent_col[:-2]]]
+            joined = joined.join(table, find_column(table, parent_col) == id_column(parent, parent_col))
+        path.append(id_column(table, type_id))
+    leaf = tables[H2_LEVELS[depth][0]]
+    stmt = select(*path, *record_columns(leaf)).select_from(joined).order_by(*path)
+    if design_filters:
+        stmt = stmt.where(*design_filters)
+    return stmt, len(path)
+
+
+def h2_rows(engine: Engine, tables: Dict[str, Table], design_filters: List[Any]) -> Iterator[tuple]:
+    """H2 record rows, depth-first, from one ordered cursor per level."""
+    with _stream(engine) as conn:
+        cursors = []
+        for depth in range(len(H2_LEVELS)):
+            stmt, width = _level_query(tables, depth, design_filters)
+            cursors.append(_keyed(conn.execute(stmt), width))
+        for _, values in heapq.merge(*cursors, key=lambda item: item[0]):
+            yield values
+
+
+def _keyed(result, width: int) -> Iterator[tuple]:
+    """``(id path, record values)`` per row of a ``_level_query`` result."""
+    for row in result:
+        yield tuple(row[:width]), tuple(row[width:])
+
+
+def flat_rows(engine: Engine, tables: Iterable[Table]) -> Iterator[tuple]:
+    """Record rows of each table in turn (HVD, HSL), ordered by primary key."""
+    with _stream(engine) as conn:
+        for table in tables:
+            stmt = select(*record_columns(table)).order_by(*table.primary_key.columns)
+            for row in conn.execute(stmt):
+                yield tuple(row)
+
+
+def export_csv(engine: Engine, tables: Dict[str, Table], kind: str,
+               design_filters: List[Any] | None = None) -> Iterator[str]:
+    """CSV text chunks for *kind* ``h2``, ``hvd`` or ``hsl``."""
+    if kind == "h2":
+        return _csv_chunks(h2_rows(engine, tables, design_filters or []))
+    if kind == "hvd":
+        return _csv_chunks(flat_rows(engine, [tables["vessel_details"]]))
+    if kind == "hsl":
+        return _csv_chunks(flat_rows(engine, [tables["species_list"], tables["individual_species"]]))
+    raise ValueError(f"Unknown export '{kind}'")
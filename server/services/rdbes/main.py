@@ -5,7 +5,20 @@
 RDBES Flask micro-service – Oracle edition (schema-aware)
 
 • One **POST** endpoint per RDBES table         →  JSON payload ↦ INSERT
+• One **POST** ``/<table>/bulk`` per RDBES table →  JSON array ↦ array INSERT
+• **POST** ``/upload``                           →  whole DE→…→BV design in one transaction
+• **DELETE** ``/design/<DEid>``                  →  whole design subtree in one transaction
+• ``?mode=upsert`` on ``/bulk`` and ``/upload``  →  MERGE on the natural keys
+  of ``RDBES_MERGE_KEYS`` (re-submitting a trip updates instead of duplicating)
+• One **GET** endpoint per RDBES table           →  typed filters, ``fields=``,
+  ``limit``/``after`` keyset pages, ``format=ndjson`` streaming (see query.py),
+  Arrow IPC for ``Accept: application/vnd.apache.arrow.stream``
+• **GET** ``/export/<h2|hvd|hsl>``                →  streamed RDBES CSV (see export.py)
 • Three **GET** endpoints (harbour / area / metier) →  list reference data
+  (``POST /harbour/query`` takes the ``port_no`` list as a JSON body)
+• **POST** ``/area``                             →  FAO areas of many points in one call
+• **POST** ``/metier``                           →  many metier lookups in one call
+  (served from an in-memory index of ``rdbes.metier``, see metier.py)
 • Identifiers are **case-insensitive** on inserts – any JSON key casing
   is mapped to the proper Oracle column name.
 
@@ -25,12 +38,16 @@ Quick start
        pip install flask sqlalchemy oracledb
        python app.py
 
-3. Insert a row::
+3. Insert a row, or many in one transaction::
 
        curl -X POST http://localhost:5042/design \
             -H "Content-Type: application/json" \
             -d '{"label":"Q123", "DErecordType":"DE", … }'
 
+       curl -X POST http://localhost:5042/biological_variable/bulk \
+            -H "Content-Type: application/json" \
+            -d '[{"SAid": 1, … }, {"SAid": 1, … }]'
+
 4. List reference data::
 
        curl http://localhost:5042/harbour
@@ -44,21 +61,34 @@ import os
 import oracledb                      # Oracle Python driver
 from typing import Any, Dict, List
 from datetime import datetime
-from flask import Flask, abort, jsonify, request
+from flask import Flask, Response, abort, jsonify, request
 from sqlalchemy import (
-    MetaData,
     Table,
-    create_engine,
     text,
     select,
 )
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, scoped_session
 
-from server.common.helper import to_dict, _payload_to_values, parse_int_list
-from server.common.geo import get_fao_area
+from server.common.arrow import arrow_response, columns_from_result, wants_arrow
+from server.common.helper import to_dict, _payload_to_values, parse_int_list, query_arg
+from server.common.geo import get_fao_area, get_fao_areas
 from server.common.fetch import fetch_many
+from server.common.reflection import reflect_tables
+from server.common.session import oracle_engine, pool_stats
 from server.services.rdbes.models import Harbour
+from server.services.rdbes.dml import (
+    PayloadError,
+    bulk_insert,
+    delete_design,
+    merge_rows,
+    rows_to_values,
+    single_pk,
+    upload_tree,
+)
+from server.services.rdbes.export import export_csv
+from server.services.rdbes.metier import MetierIndex
+from server.services.rdbes.query import build_select, column_filters
 
 # ---------------------------------------------------------------------------
 # Create Session
@@ -83,16 +113,10 @@ _missing: List[str] = [k for k, v in CONNECT_ARGS.items() if not v]
 if _missing:
     raise RuntimeError(f"Missing env vars: {', '.join(_missing)}")
 
-engine = create_engine(
-    "oracle+oracledb://",           # credentials via connect_args
-    connect_args=CONNECT_ARGS,
-    future=True,
-    pool_pre_ping=True,
-    echo=False,
-)
+# credentials via connect_args; pool/fetch settings from RDBES_DB_* / DB_*
+engine = oracle_engine(CONNECT_ARGS, "rdbes")
 
 # ───────────────────────────── metadata ────────────────────────────────
-metadata = MetaData(schema=SCHEMA)
 TABLES = [
     "design",
     "fishing_trip",
@@ -108,8 +132,8 @@ TABLES = [
     "commercial_landing",
     "commercial_effort",
 ]
-for t in TABLES:
-    Table(t, metadata, autoload_with=engine, schema=SCHEMA)
+# RDBES_REFLECTION_CACHE=<dir> keeps the reflected tables between starts
+metadata = reflect_tables(engine, SCHEMA, TABLES, cache_dir=os.getenv("RDBES_REFLECTION_CACHE"))
 
 # ───────────────────── ORM & read-only reference tables ────────────────
 Session = scoped_session(
@@ -228,28 +252,28 @@ def get_area(lat: float, lon: float) -> str:
 
 
 # --- Metier ----------------------------------------------------------------
+def load_metiers() -> List[Dict[str, Any]]:
+    """All valid ``rdbes.metier`` rows, for the in-memory ``MetierIndex``."""
+    with SessionLocal() as session:
+        query = text("""
+            SELECT area_code, gear_type, target_assemblage, mesh_size_from, mesh_size_to, metier
+              FROM rdbes.metier
+             WHERE valid = 1
+        """)
+        return [dict(row._mapping) for row in session.execute(query)]
+
+
+metier_index = MetierIndex(load_metiers, ttl=float(os.getenv("RDBES_METIER_TTL", 3600)))
+
+
 def get_metier(area_code: str, gear_type: str, target_assemblage: str, mesh_size: int)-> str:
 
-    with SessionLocal() as session:
-        try:
-            query = text("""
-                SELECT metier FROM rdbes.metier
-                 WHERE area_code  = :area_code
-                   AND gear_type = :gear_type
-                   AND target_assemblage = :target_assemblage
-                   AND nvl(mesh_size_from,0) <= :mesh_size
-                   AND nvl(mesh_size_to,10000) >= :mesh_size
-                   AND valid = 1
-            """)
-            result = session.execute(query, {"area_code": area_code, "gear_type": gear_type, "target_assemblage": target_assemblage, "mesh_size": mesh_size}).fetchone()
-            session.close()
-        except Exception as e:
-            return jsonify({"error": str(e)}), 500
+    try:
+        metier = metier_index.lookup(area_code, gear_type, target_assemblage, mesh_size)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-    if result and result[0]:
-        return jsonify({"metier": result[0]})
-    else:
-        return jsonify({"metier": None})
+    return jsonify({"metier": metier})
 
 
 # ───────────────────────────── app ─────────────────────────────────────
@@ -262,7 +286,9 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "rdbes-service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(engine),
+        "metier_index": metier_index.stats(),
     }
 
     return jsonify(response), 200
@@ -291,8 +317,9 @@ def DBhealth_check():
 
 # --- Harbour -------------------------------------------------------------
 @app.get("/harbour")
+@app.post("/harbour/query")
 def harbour_endpoint():
-    port_nos = parse_int_list(request.args.get("port_no"), param_name="port_no")
+    port_nos = parse_int_list(query_arg("port_no"), param_name="port_no")
     data = get_harbour(port_nos)
     return jsonify(data) if data else abort(404, "Harbour not found")
 
@@ -311,6 +338,30 @@ def area_endpoint():
     return code if code else abort(404, "Area code not found")
 
 
+@app.post("/area")
+def area_batch_endpoint():
+    """
+    FAO area codes of many points in one spatial-index query.
+    Body: ``{"lat": [...], "lon": [...]}`` (``null`` allowed); returns
+    ``{"codes": [...]}`` in input order (``null`` = missing point or no area).
+    """
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception as exc:  # bad JSON
+        return jsonify(error="Invalid JSON", detail=str(exc)), 400
+
+    lats = payload.get("lat") if isinstance(payload, dict) else None
+    lons = payload.get("lon") if isinstance(payload, dict) else None
+    if not isinstance(lats, list) or not isinstance(lons, list) or len(lats) != len(lons):
+        return jsonify(error="Payload must be {'lat': [...], 'lon': [...]} of equal length"), 400
+
+    try:
+        codes = get_fao_areas(lats, lons)
+    except (TypeError, ValueError) as exc:
+        return jsonify(error="Invalid coordinates", detail=str(exc)), 400
+    return jsonify(codes=codes), 200
+
+
 # --- Metier -------------------------------------------------------------
 @app.get("/metier")
 def metier_endpoint()-> str:
@@ -328,6 +379,114 @@ def metier_endpoint()-> str:
     return metier if metier else abort(404, "Metier not found")
 
 
+@app.post("/metier")
+def metier_batch_endpoint():
+    """
+    Resolve many lookups in one call. Body: JSON array of
+    ``{"area_code", "gear_type", "target_assemblage", "mesh_size"}``;
+    returns ``{"metiers": [...]}`` in input order (``null`` = no match).
+    """
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception as exc:  # bad JSON
+        return jsonify(error="Invalid JSON", detail=str(exc)), 400
+
+    if not isinstance(payload, list):
+        return jsonify(error="Payload must be a JSON array of objects"), 400
+
+    items = []
+    for i, item in enumerate(payload):
+        if not isinstance(item, dict):
+            return jsonify(error=f"Item {i} is not a JSON object"), 400
+        mesh_size = item.get("mesh_size")
+        if mesh_size is not None and not isinstance(mesh_size, (int, float)):
+            return jsonify(error=f"Item {i}: 'mesh_size' must be a number"), 400
+        items.append((item.get("area_code"), item.get("gear_type"), item.get("target_assemblage"), mesh_size))
+
+    try:
+        metiers = metier_index.lookup_many(items)
+    except SQLAlchemyError as db_err:
+        return jsonify(error="database error", detail=str(db_err.orig)), 500
+    return jsonify(metiers=metiers), 200
+
+
+def _upsert_mode() -> bool:
+    """``True`` for ``?mode=upsert``; any other mode than ``insert`` aborts with 400."""
+    mode = request.args.get("mode", "insert").lower()
+    if mode not in ("insert", "upsert"):
+        abort(400, "mode must be 'insert' or 'upsert'")
+    return mode == "upsert"
+
+
+# --- Upload ---------------------------------------------------------------
+@app.post("/upload")
+def upload_endpoint():
+    """
+    Insert a whole design (VD/SL/IS side tables and DE→SD→FT→FO→SS→SA→BV)
+    in one transaction. Body: ``{"<table>": [rows…], …}``; rows may carry
+    a client ``"_key"`` that child rows use in their parent-id columns.
+    Returns the rows inserted per table and the client key → id map.
+    With ``?mode=upsert`` tables that have a natural key are merged.
+    """
+    upsert = _upsert_mode()
+    try:
+        payload = request.get_json(force=True, silent=False)
+    except Exception as exc:  # bad JSON
+        return jsonify(error="Invalid JSON", detail=str(exc)), 400
+
+    if not isinstance(payload, dict):
+        return jsonify(error="Payload must be a JSON object of table arrays"), 400
+
+    tables = {name: metadata.tables[f"{SCHEMA}.{name}"] for name in TABLES}
+    try:
+        with engine.begin() as conn:  # all levels or nothing
+            result = upload_tree(conn, tables, payload, upsert=upsert)
+    except PayloadError as exc:
+        return jsonify(error=str(exc)), 400
+    except SQLAlchemyError as db_err:
+        return jsonify(error="database error", detail=str(db_err.orig)), 500
+    return jsonify(message="uploaded", **result), 201
+
+
+@app.delete("/design/<int:de_id>")
+def delete_design_endpoint(de_id: int):
+    """
+    Delete design *de_id* and its SD→FT→FO→SS→SA→FM/BV subtree in one
+    transaction (set-based, one statement per table). Returns the rows
+    removed per table; 404 when the design does not exist.
+    """
+    tables = {name: metadata.tables[f"{SCHEMA}.{name}"] for name in TABLES}
+    try:
+        with engine.begin() as conn:  # whole subtree or nothing
+            counts = delete_design(conn, tables, de_id)
+    except PayloadError as exc:
+        return jsonify(error=str(exc)), 400
+    except SQLAlchemyError as db_err:
+        return jsonify(error="database error", detail=str(db_err.orig)), 500
+    if not counts["design"]:
+        abort(404, f"Design {de_id} not found")
+    return jsonify(message="deleted", counts=counts), 200
+
+
+# --- Export ---------------------------------------------------------------
+@app.get("/export/<kind>")
+def export_endpoint(kind: str):
+    """
+    Stream the RDBES ``h2`` (hierarchical DE→…→BV), ``hvd`` or ``hsl`` CSV
+    as it is read from Oracle. For ``h2`` design columns filter the
+    designs exported, e.g. ``?deyear=2024``.
+    """
+    if kind not in ("h2", "hvd", "hsl"):
+        abort(404, f"Unknown export '{kind}'")
+    tables = {name: metadata.tables[f"{SCHEMA}.{name}"] for name in TABLES}
+    design_filters = column_filters(tables["design"], request.args)
+    return Response(
+        export_csv(engine, tables, kind, design_filters),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={kind.upper()}.csv"},
+    )
+
+
 # -------- insert-only dynamic endpoints ---------------------------------
 for tbl_name in TABLES:
     table_obj: Table = metadata.tables[f"{SCHEMA}.{tbl_name}"]
@@ -382,27 +541,84 @@ for tbl_name in TABLES:
         endpoint=endpoint_name,
     )
 
+    # --- Bulk insert: JSON array -> array DML in one transaction ---
+    def _make_bulk_view(table: Table):
+        def view():
+            try:
+                payload = request.get_json(force=True, silent=False)
+            except Exception as exc:  # bad JSON
+                return jsonify(error="Invalid JSON", detail=str(exc)), 400
+
+            if not isinstance(payload, list):
+                return jsonify(error="Payload must be a JSON array of objects"), 400
+            upsert = _upsert_mode()
+
+            try:
+                rows = rows_to_values(table, payload)
+            except PayloadError as exc:
+                return jsonify(error=str(exc), allowed=[col.name for col in table.columns]), 400
+
+            try:
+                with engine.begin() as conn:  # all rows or none
+                    if upsert:
+                        changed = merge_rows(conn, table, rows)
+                    else:
+                        ids = bulk_insert(conn, table, rows)
+            except PayloadError as exc:
+                return jsonify(error=str(exc)), 400
+            except SQLAlchemyError as db_err:
+                return jsonify(error="database error", detail=str(db_err.orig)), 500
+            if upsert:
+                return jsonify(message="merged", count=len(rows), changed=changed), 200
+            return jsonify(message="inserted", count=len(rows), ids=ids), 201
+
+        view.__name__ = f"view_bulk_insert_{tbl_name}"  # unique fn name
+        return view
+
+    app.add_url_rule(
+        f"/{tbl_name}/bulk",
+        view_func=_make_bulk_view(table_obj),
+        methods=["POST"],
+        endpoint=f"bulk_insert_{tbl_name}",
+    )
+
     # --- Select/GET endpoint per table (all rows or filtered by query params) ---
     def _make_select_view(table: Table):
         def view():
-            try:
-                filters = []
-                for col in table.columns:
-                    val = request.args.get(col.name)
-                    if val is not None:
-                        filters.append(col == val)
+            stmt, limit = build_select(table, request.args)
+
+            if request.args.get("format") == "ndjson":
+                def generate():
+                    # server-side cursor: rows leave Oracle in arraysize chunks
+                    with engine.connect().execution_options(stream_results=True, yield_per=1000) as conn:
+                        for row in conn.execute(stmt):
+                            yield app.json.dumps(dict(row._mapping)) + "\n"
 
-                stmt = select(table)
-                if filters:
-                    stmt = stmt.where(*filters)
+                return Response(generate(), mimetype="application/x-ndjson")
 
+            arrow = wants_arrow()
+            try:
                 with engine.connect() as conn:
                     result = conn.execute(stmt)
-                    rows = [dict(row._mapping) for row in result]
-                    return jsonify(rows), 200
+                    if arrow:
+                        data = columns_from_result(result)
+                    else:
+                        rows = [dict(row._mapping) for row in result]
             except SQLAlchemyError as db_err:
                 return jsonify(error="database error", detail=str(db_err.orig)), 500
 
+            if arrow:
+                resp = arrow_response(data)
+                count = len(next(iter(data["data"].values()), []))
+            else:
+                resp = jsonify(rows)
+                count = len(rows)
+            if limit is not None and count == limit:
+                # full page: the next one starts after the last key
+                pk = single_pk(table).name
+                resp.headers["X-Next-After"] = str(data["data"][pk][-1] if arrow else rows[-1][pk])
+            return resp, 200
+
         view.__name__ = f"view_select_{tbl_name}"  # unique fn name
         return view
 
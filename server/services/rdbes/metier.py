@@ -0,0 +1,92 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+In-process index of the valid ``rdbes.metier`` rows.
+
+(area_code, gear_type, target_assemblage) → mesh intervals sorted by
+their lower bound, reloaded from Oracle once the TTL has passed. The
+bounds follow the SQL the service used per request::
+
+    nvl(mesh_size_from, 0) <= :mesh_size AND nvl(mesh_size_to, 10000) >= :mesh_size
+
+i.e. a NULL bound is open, both ends are inclusive and a NULL mesh size
+matches nothing. (``app/client/utils/rdbes.metier6`` mirrors the PL/SQL
+function instead: half-open intervals with 999 as the open upper bound.)
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MESH_FROM_DEFAULT = 0
+MESH_TO_DEFAULT = 10000
+
+Key = Tuple[str, str, str]
+
+
+class MetierIndex:
+    """
+    Resolve (area, gear, assemblage, mesh) → metier without a database
+    round trip. *loader* returns the valid rows as mappings with
+    ``area_code``, ``gear_type``, ``target_assemblage``,
+    ``mesh_size_from``, ``mesh_size_to`` and ``metier``.
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[Any]], ttl: float = 3600.0) -> None:
+        self._loader = loader
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index: Dict[Key, Tuple[List[float], List[Tuple[float, float, str]]]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def refresh(self) -> None:
+        """Reload the rows now."""
+        groups: Dict[Key, List[Tuple[float, float, str]]] = {}
+        for row in self._loader():
+            lo = MESH_FROM_DEFAULT if row["mesh_size_from"] is None else float(row["mesh_size_from"])
+            hi = MESH_TO_DEFAULT if row["mesh_size_to"] is None else float(row["mesh_size_to"])
+            key = (row["area_code"], row["gear_type"], row["target_assemblage"])
+            groups.setdefault(key, []).append((lo, hi, row["metier"]))
+        index = {}
+        for key, intervals in groups.items():
+            intervals.sort()
+            index[key] = ([lo for lo, _, _ in intervals], intervals)
+        self._index, self._loaded_at = index, time.monotonic()
+
+    def _current(self) -> Dict[Key, Tuple[List[float], List[Tuple[float, float, str]]]]:
+        if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+            with self._lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl:
+                    self.refresh()
+        return self._index
+
+    def lookup(self, area_code: str, gear_type: str, target_assemblage: str,
+               mesh_size: Optional[float]) -> Optional[str]:
+        """The metier whose interval holds *mesh_size*, or ``None``."""
+        return self._lookup(self._current(), area_code, gear_type, target_assemblage, mesh_size)
+
+    def lookup_many(self, items: Iterable[Tuple[str, str, str, Optional[float]]]) -> List[Optional[str]]:
+        """``lookup`` for every ``(area, gear, assemblage, mesh)`` tuple, in order."""
+        index = self._current()
+        return [self._lookup(index, *item) for item in items]
+
+    @staticmethod
+    def _lookup(index, area_code, gear_type, target_assemblage, mesh_size) -> Optional[str]:
+        if mesh_size is None:
+            return None
+        entry = index.get((area_code, gear_type, target_assemblage))
+        if entry is None:
+            return None
+        lows, intervals = entry
+        # Only intervals starting at or below the mesh size can hold it
+        for lo, hi, metier in intervals[:bisect.bisect_right(lows, mesh_size)]:
+            if mesh_size <= hi:
+                return metier
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+        return {"keys": len(self._index), "age_seconds": age, "ttl": self.ttl}
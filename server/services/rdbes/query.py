@@ -0,0 +1,131 @@
+#!/usr/local/bin/python3
+# coding: utf-8
+
+"""
+Query-string → SELECT for the per-table GET endpoints of the RDBES service.
+
+Reserved parameters
+ fields=a,b,c     only these columns (the primary key is always included)
+ limit=N          at most N rows, ordered by the primary key
+ after=K          keyset pagination: rows with primary key > K
+ format=ndjson    stream one JSON object per line instead of one JSON list
+
+Any other parameter named like a column is a typed filter; values are
+converted to the column's Python type (400 when they do not fit)::
+
+ ?DEyear=2024            equality
+ ?FTid=101,102,103       IN list
+ ?DEyear=2020..2024      inclusive range, either end may be left open
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+from flask import abort
+from sqlalchemy import Select, Table, select
+
+from server.services.rdbes.dml import find_column, single_pk
+
+RESERVED = {"fields", "limit", "after", "format"}
+MAX_LIMIT = 50000
+
+
+def _convert(col, raw: str) -> Any:
+    """*raw* as a value of *col*'s Python type; 400 when it does not parse."""
+    try:
+        py_type = col.type.python_type
+    except NotImplementedError:
+        return raw
+    try:
+        if py_type is bool:
+            return raw.lower() in {"1", "true", "yes"}
+        if py_type in (int, float, Decimal):
+            return py_type(raw)
+        if py_type is datetime:
+            return datetime.fromisoformat(raw)
+        if py_type is date:
+            return date.fromisoformat(raw)
+    except (ValueError, ArithmeticError):
+        abort(400, f"Invalid value '{raw}' for column '{col.name}'")
+    return raw
+
+
+def _filter(col, raw: str):
+    """``a`` → ``=``, ``a,b`` → ``IN``, ``a..b`` / ``a..`` / ``..b`` → range."""
+    if ".." in raw:
+        low, _, high = raw.partition("..")
+        conds = []
+        if low.strip():
+            conds.append(col >= _convert(col, low.strip()))
+        if high.strip():
+            conds.append(col <= _convert(col, high.strip()))
+        if not conds:
+            abort(400, f"Empty range for column '{col.name}'")
+        return conds
+    if "," in raw:
+        return [col.in_([_convert(col, v.strip()) for v in raw.split(",") if v.strip()])]
+    return [col == _convert(col, raw)]
+
+
+def _int_arg(args, name: str) -> Optional[int]:
+    raw = args.get(name)
+    if raw is None:
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        abort(400, f"'{name}' must be an integer")
+    if value < 1:
+        abort(400, f"'{name}' must be positive")
+    return value
+
+
+def column_filters(table: Table, args) -> list:
+    """Typed conditions for every non-reserved *args* entry named like a column of *table*."""
+    filters = []
+    for name, raw in args.items():
+        if name in RESERVED:
+            continue
+        col = find_column(table, name)
+        if col is not None:
+            filters.extend(_filter(col, raw))
+    return filters
+
+
+def build_select(table: Table, args) -> tuple[Select, Optional[int]]:
+    """
+    SELECT for *table* from the request *args* (see module docstring).
+
+    Returns the statement and the page size (``None`` without ``limit``).
+    """
+    pk_col = single_pk(table)
+
+    columns = list(table.columns)
+    if args.get("fields"):
+        names = [n.strip() for n in args["fields"].split(",") if n.strip()]
+        columns = [find_column(table, n) for n in names]
+        unknown = [n for n, c in zip(names, columns) if c is None]
+        if unknown:
+            abort(400, f"Unknown field(s) for '{table.name}': {', '.join(unknown)}")
+        if pk_col is not None and pk_col not in columns:
+            columns.insert(0, pk_col)
+    stmt = select(*columns)
+    filters = column_filters(table, args)
+    if filters:
+        stmt = stmt.where(*filters)
+
+    limit = _int_arg(args, "limit")
+    if limit is not None:
+        limit = min(limit, MAX_LIMIT)
+    after = args.get("after")
+    if limit is not None or after is not None:
+        if pk_col is None:
+            abort(400, f"'{table.name}' has no single-column primary key to page on")
+        if after is not None:
+            stmt = stmt.where(pk_col > _convert(pk_col, after))
+        stmt = stmt.order_by(pk_col)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+    return stmt, limit
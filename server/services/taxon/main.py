@@ -11,6 +11,8 @@ sexual_maturity, otolith, harbour, vessel, gear).
 * No DDL — assumes tables already exist in Oracle.
 * Connection parameters come from env‑vars (see below).
 * Each endpoint returns a thin JSON object with the columns defined here.
+* ID-list endpoints also answer ``POST /<resource>/query`` with the same
+  parameters in a JSON body (ID lists as arrays), for lists too long for a URL.
 * SQLAlchemy 2.x, typing friendly, future‑style sessions.
 
 Required environment variables
@@ -41,15 +43,15 @@ import os
 from datetime import datetime
 from flask import Flask, abort, jsonify, request
 
-from server.common.session import get_session_local
+from server.common.session import get_session_local, pool_stats
 from server.common.fetch import fetch_many
-from server.common.helper import parse_int_list
+from server.common.helper import parse_int_list, query_arg
 from server.services.taxon.models import Species
 
 # ---------------------------------------------------------------------------
 # Create Session
 # ---------------------------------------------------------------------------
-SessionLocal = get_session_local()
+SessionLocal = get_session_local("taxon")
 
 
 
@@ -72,15 +74,17 @@ def health():
     current_timestamp = datetime.now().isoformat()
     response = {
         "taxon-service Status": "200 OK",
-        "timestamp": current_timestamp
+        "timestamp": current_timestamp,
+        "db_pool": pool_stats(SessionLocal),
     }
     return jsonify(response), 200
 
 
 # --- Species -------------------------------------------------------------
 @app.get("/species")
+@app.post("/species/query")
 def species_endpoint():
-    species_nos = parse_int_list(request.args.get("species_no"), param_name="species_no")
+    species_nos = parse_int_list(query_arg("species_no"), param_name="species_no")
     data = get_species(species_nos)
     return jsonify(data) if data else abort(404, "No Species found")
 